@@ -1,17 +1,208 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, Flask, Response, abort, current_app, g, has_request_context, jsonify, render_template, request, redirect, url_for, session, flash, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from markupsafe import escape
+from sqlalchemy import URL, create_engine, event, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import date, timedelta, datetime
+from werkzeug.local import LocalProxy
 from werkzeug.security import generate_password_hash, check_password_hash
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import bisect
 import csv
-from threading import Timer
+import hashlib
+import heapq
+import io
+import itertools
+import json
+import os
+import queue
+import re
+import secrets
+import time
+import zlib
+from threading import Condition, Lock, Thread
+from urllib.parse import quote
+import click
 import pytz
 
-app = Flask(__name__)
-app.secret_key = "W_FitTrack"
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///fittrack.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db = SQLAlchemy(app)
+from config import configs
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+try:
+    from flask_debugtoolbar import DebugToolbarExtension
+    from flask_debugtoolbar.panels import DebugPanel
+except ImportError:
+    DebugToolbarExtension = None
+    DebugPanel = object
+
+db = SQLAlchemy()
+
+main_bp = Blueprint('main', __name__, cli_group=None)
+auth_bp = Blueprint('auth', __name__)
+meals_bp = Blueprint('meals', __name__)
+workouts_bp = Blueprint('workouts', __name__)
+analytics_bp = Blueprint('analytics', __name__)
+notifications_bp = Blueprint('notifications', __name__)
+BLUEPRINTS = (main_bp, auth_bp, meals_bp, workouts_bp, analytics_bp, notifications_bp)
+
+_resources_lock = Lock()
+
+def lazy_resource(name, factory):
+    #built on first use inside each worker, so nothing thread or connection backed exists before a fork
+    def get():
+        app = current_app._get_current_object()
+        resources = app.extensions.setdefault('fittrack', {})
+        if name not in resources:
+            with _resources_lock:
+                if name not in resources:
+                    resources[name] = factory(app)
+        return resources[name]
+    return LocalProxy(get)
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas, read_only=False):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        #the journal mode is stored in the database file and cannot be changed from a read-only connection
+        if read_only and name == 'journal_mode':
+            continue
+        cursor.execute(f'PRAGMA {name}={value}')
+    if read_only:
+        cursor.execute('PRAGMA query_only=ON')
+    cursor.close()
+
+def init_sqlite_engine(app):
+    pragmas = app.config['SQLITE_PRAGMAS']
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', lambda dbapi_connection, record: apply_sqlite_pragmas(dbapi_connection, pragmas))
+        instrument_engine(db.engine)
+
+def create_read_only_engine(app):
+    #analytics reads get their own pool of read-only connections so they never queue behind writers
+    engine = db.engine
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return engine
+    read_engine = create_engine(
+        #built from parts so the quoted path reaches sqlite as is; a url string would be unquoted again
+        URL.create('sqlite', database=f'file:{quote(engine.url.database)}', query={'mode': 'ro', 'uri': 'true'}),
+        poolclass=QueuePool,
+        pool_size=app.config['ANALYTICS_POOL_SIZE'],
+        max_overflow=0,
+        pool_timeout=app.config['SQLALCHEMY_ENGINE_OPTIONS'].get('pool_timeout', 30),
+        connect_args={'check_same_thread': False}
+    )
+    pragmas = app.config['SQLITE_PRAGMAS']
+    event.listen(read_engine, 'connect',
+                 lambda dbapi_connection, record: apply_sqlite_pragmas(dbapi_connection, pragmas, read_only=True))
+    instrument_engine(read_engine)
+    return read_engine
+
+read_only_engine = lazy_resource('read_only_engine', create_read_only_engine)
+
+def analytics_session():
+    return Session(read_only_engine._get_current_object())
+
+def new_query_stats():
+    return {'count': 0, 'total_ms': 0.0, 'slowest': []}
+
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    #only statements issued while serving a request are recorded; background jobs and cli commands run without one
+    if has_request_context() and 'query_stats' in g:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if not started:
+        return
+    elapsed = (time.perf_counter() - started.pop()) * 1000
+    if not has_request_context() or 'query_stats' not in g:
+        return
+    stats = g.query_stats
+    stats['count'] += 1
+    stats['total_ms'] += elapsed
+    slowest = stats['slowest']
+    limit = current_app.config['SLOW_QUERY_COUNT']
+    if len(slowest) < limit:
+        heapq.heappush(slowest, (elapsed, statement))
+    elif limit and elapsed > slowest[0][0]:
+        heapq.heapreplace(slowest, (elapsed, statement))
+
+def _query_failed(context):
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+def instrument_engine(engine):
+    #listeners go on each engine rather than the Engine class so a second import of this module cannot count twice
+    event.listen(engine, 'before_cursor_execute', _query_started)
+    event.listen(engine, 'after_cursor_execute', _query_finished)
+    event.listen(engine, 'handle_error', _query_failed)
+
+def slowest_queries(stats):
+    return sorted(stats['slowest'], key=lambda item: item[0], reverse=True)
+
+class QueryTimingPanel(DebugPanel):
+    #debug toolbar panel showing the numbers the Server-Timing header reports; registered only when flask-debugtoolbar is installed
+    name = 'QueryTiming'
+    has_content = True
+
+    def nav_title(self):
+        return 'Query timing'
+
+    def nav_subtitle(self):
+        stats = g.get('query_stats') or new_query_stats()
+        return f"{stats['count']} queries in {stats['total_ms']:.1f} ms"
+
+    def title(self):
+        return 'Query timing'
+
+    def url(self):
+        return ''
+
+    def content(self):
+        stats = g.get('query_stats') or new_query_stats()
+        elapsed = (time.perf_counter() - g.request_started) * 1000 if 'request_started' in g else 0.0
+        rows = ''.join(f'<tr><td>{ms:.2f} ms</td><td><code>{escape(statement)}</code></td></tr>'
+                       for ms, statement in slowest_queries(stats))
+        return (f'<p>{stats["count"]} queries, {stats["total_ms"]:.2f} ms in the database, {elapsed:.2f} ms so far in the request</p>'
+                f'<table><thead><tr><th>Time</th><th>Slowest statements</th></tr></thead><tbody>{rows}</tbody></table>')
+
+def exempt_from_request_budget(view):
+    #long-polls and streams are slow by design; logging them would bury the slow pages
+    view.exempt_from_request_budget = True
+    return view
+
+@main_bp.before_app_request
+def start_request_timing():
+    g.request_started = time.perf_counter()
+    g.query_stats = new_query_stats()
+
+@main_bp.after_app_request
+def report_request_timing(response):
+    stats = g.get('query_stats')
+    if stats is None:
+        return response
+    elapsed = (time.perf_counter() - g.request_started) * 1000
+    if current_app.config['SERVER_TIMING']:
+        response.headers['Server-Timing'] = f'db;dur={stats["total_ms"]:.1f};desc="{stats["count"]} queries", app;dur={elapsed:.1f}'
+    if getattr(current_app.view_functions.get(request.endpoint), 'exempt_from_request_budget', False):
+        return response
+    query_budget = current_app.config['REQUEST_QUERY_BUDGET']
+    latency_budget = current_app.config['REQUEST_LATENCY_BUDGET_MS']
+    if (query_budget is not None and stats['count'] > query_budget) or (latency_budget is not None and elapsed > latency_budget):
+        slowest = '; '.join(f'{ms:.1f} ms {" ".join(statement.split())[:200]}' for ms, statement in slowest_queries(stats))
+        current_app.logger.warning('%s %s over budget: %d queries, %.1f ms in db, %.1f ms total; slowest: %s',
+                                   request.method, request.path, stats['count'], stats['total_ms'], elapsed, slowest or 'none')
+    return response
 
 LOCAL_TIMEZONE = pytz.timezone('Asia/Jakarta') 
 UTC = pytz.UTC
@@ -30,6 +221,8 @@ class User(db.Model):
     workout_reminder = db.Column(db.Boolean, default=True)
     meal_reminder = db.Column(db.Boolean, default=True)
     progress_summary_frequency = db.Column(db.String(20), default='weekly')
+    #set when the account deletion is requested; the row itself goes once the purge has removed the user's data
+    deleted_at = db.Column(db.DateTime)
 
 class MealTemplate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -40,6 +233,7 @@ class MealTemplate(db.Model):
     carbs = db.Column(db.Float, default=0)
     fats = db.Column(db.Float, default=0)
     frequency = db.Column(db.Integer, default=1)
+    __table_args__ = (db.UniqueConstraint('user_id', 'name', name='uq_meal_template_user_name'),)
 
     @classmethod
     def get_or_create(cls, user_id, name, calories, protein, carbs, fats):
@@ -63,6 +257,7 @@ class Meal(db.Model):
     quantity = db.Column(db.Integer, default=1)
     date = db.Column(db.Date, default=date.today)
     is_favorite = db.Column(db.Boolean, default=False)
+    __table_args__ = (db.Index('ix_meal_user_id_date', 'user_id', 'date'),)
 
 class WorkoutTemplate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -73,6 +268,7 @@ class WorkoutTemplate(db.Model):
     frequency = db.Column(db.Integer, default=1)
     is_custom = db.Column(db.Boolean, default=False)  
     calories_per_hour = db.Column(db.Integer, default=0) 
+    __table_args__ = (db.UniqueConstraint('user_id', 'name', name='uq_workout_template_user_name'),)
 
     @classmethod
     def get_or_create(cls, user_id, name, exercise_type, muscle_groups, is_custom=False, calories_per_hour=0):
@@ -106,6 +302,7 @@ class Workout(db.Model):
     calories_burned = db.Column(db.Integer, nullable=False)
     date = db.Column(db.Date, default=date.today)
     is_favorite = db.Column(db.Boolean, default=False)
+    __table_args__ = (db.Index('ix_workout_user_id_date', 'user_id', 'date'),)
 
 class UserProfile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -128,6 +325,7 @@ class BodyMeasurement(db.Model):
     thighs = db.Column(db.Float) 
     neck = db.Column(db.Float)
     notes = db.Column(db.Text)  
+    __table_args__ = (db.Index('ix_body_measurement_user_id_date', 'user_id', 'date'),)
 
 class Notification(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -135,26 +333,419 @@ class Notification(db.Model):
     message = db.Column(db.String(500), nullable=False)
     created_at = db.Column(db.DateTime, default=db.func.now())
     is_read = db.Column(db.Boolean, default=False)
+    kind = db.Column(db.String(50))
+    period_key = db.Column(db.String(20))
+    __table_args__ = (
+        db.Index('ix_notification_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('uq_notification_user_id_kind_period_key', 'user_id', 'kind', 'period_key', unique=True),
+    )
+
+class DailyRollup(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    calories_consumed = db.Column(db.Integer, default=0)
+    calories_burned = db.Column(db.Integer, default=0)
+    protein = db.Column(db.Float, default=0)
+    carbs = db.Column(db.Float, default=0)
+    fats = db.Column(db.Float, default=0)
+    workout_volume = db.Column(db.Float, default=0)
+    meal_count = db.Column(db.Integer, default=0)
+    workout_count = db.Column(db.Integer, default=0)
+    __table_args__ = (db.UniqueConstraint('user_id', 'date', name='uq_daily_rollup_user_date'),)
+
+ROLLUP_MODELS = (Meal, Workout)
+
+def _meal_rollup_query():
+    return db.session.query(
+        Meal.user_id, Meal.date,
+        db.func.count(Meal.id),
+        db.func.coalesce(db.func.sum(Meal.calories), 0),
+        db.func.coalesce(db.func.sum(Meal.protein), 0),
+        db.func.coalesce(db.func.sum(Meal.carbs), 0),
+        db.func.coalesce(db.func.sum(Meal.fats), 0)
+    ).group_by(Meal.user_id, Meal.date)
+
+def _workout_rollup_query():
+    volume = db.func.coalesce(Workout.sets, 0) * db.func.coalesce(Workout.reps, 0) * db.func.coalesce(Workout.weight, 0)
+    return db.session.query(
+        Workout.user_id, Workout.date,
+        db.func.count(Workout.id),
+        db.func.coalesce(db.func.sum(Workout.calories_burned), 0),
+        db.func.coalesce(db.func.sum(volume), 0)
+    ).group_by(Workout.user_id, Workout.date)
+
+def _build_rollup_rows(meal_rows, workout_rows):
+    rows = {}
+    for user_id, day, count, calories, protein, carbs, fats in meal_rows:
+        rows[(user_id, day)] = {'user_id': user_id, 'date': day, 'meal_count': count, 'calories_consumed': calories,
+                                'protein': protein, 'carbs': carbs, 'fats': fats,
+                                'workout_count': 0, 'calories_burned': 0, 'workout_volume': 0}
+    for user_id, day, count, calories, volume in workout_rows:
+        row = rows.setdefault((user_id, day), {'user_id': user_id, 'date': day, 'meal_count': 0, 'calories_consumed': 0,
+                                               'protein': 0, 'carbs': 0, 'fats': 0})
+        row.update(workout_count=count, calories_burned=calories, workout_volume=volume)
+    return rows
+
+def refresh_daily_rollups(user_id, dates):
+    #recompute the rollup rows of the given days from the underlying meals and workouts
+    dates = {d for d in dates if d is not None}
+    if not dates:
+        return
+    db.session.flush()
+    rows = _build_rollup_rows(
+        _meal_rollup_query().filter(Meal.user_id == user_id, Meal.date.in_(dates)).all(),
+        _workout_rollup_query().filter(Workout.user_id == user_id, Workout.date.in_(dates)).all()
+    )
+    existing = {r.date: r for r in DailyRollup.query.filter(DailyRollup.user_id == user_id, DailyRollup.date.in_(dates)).all()}
+    for day in dates:
+        row = rows.get((user_id, day))
+        rollup = existing.get(day)
+        if row is None:
+            if rollup:
+                db.session.delete(rollup)
+            continue
+        if rollup is None:
+            rollup = DailyRollup(user_id=user_id, date=day)
+            db.session.add(rollup)
+        for k, v in row.items():
+            setattr(rollup, k, v)
+
+def rebuild_daily_rollups(user_id=None):
+    meal_query, workout_query = _meal_rollup_query(), _workout_rollup_query()
+    rollup_query = DailyRollup.query
+    if user_id is not None:
+        meal_query = meal_query.filter(Meal.user_id == user_id)
+        workout_query = workout_query.filter(Workout.user_id == user_id)
+        rollup_query = rollup_query.filter(DailyRollup.user_id == user_id)
+    rows = _build_rollup_rows(meal_query.all(), workout_query.all())
+    rollup_query.delete()
+    db.session.bulk_insert_mappings(DailyRollup, list(rows.values()))
+    db.session.commit()
+    invalidate_user_cache(user_id)
+    return len(rows)
+
+class LRUCache:
+    def __init__(self, max_entries=4096, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._user_keys = defaultdict(set)
+        #bumped by every invalidation so a value computed before it is not stored after it
+        self._generation = 0
+        self._user_versions = defaultdict(int)
+        self._lock = Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def _discard(self, key):
+        self._entries.pop(key, None)
+        fields = self._user_keys.get(key[0])
+        if fields is not None:
+            fields.discard(key)
+            if not fields:
+                del self._user_keys[key[0]]
+
+    def get(self, user_id, field):
+        key = (user_id, field)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[1]
+
+    def version(self, user_id):
+        with self._lock:
+            return (self._generation, self._user_versions.get(user_id, 0))
+
+    def set(self, user_id, field, value, version=None):
+        key = (user_id, field)
+        with self._lock:
+            if version is not None and version != (self._generation, self._user_versions.get(user_id, 0)):
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            self._user_keys[user_id].add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            self.stats['invalidations'] += 1
+            if user_id is None:
+                self._generation += 1
+                self._entries.clear()
+                self._user_keys.clear()
+                return
+            self._user_versions[user_id] += 1
+            for key in list(self._user_keys.get(user_id, ())):
+                self._discard(key)
+
+    def delete(self, user_id, field):
+        with self._lock:
+            self._user_versions[user_id] += 1
+            self._discard((user_id, field))
+
+    def info(self):
+        with self._lock:
+            return {'backend': 'memory', 'size': len(self._entries), 'max_entries': self.max_entries, 'ttl': self.ttl, **self.stats}
+
+class RedisCache:
+    #one hash per user so invalidation is a single DEL; values are stored as JSON.
+    #version counters live under their own prefix so clearing every hash keeps them
+    def __init__(self, url, ttl=300, prefix='fittrack:metrics:', version_prefix='fittrack:metrics-version:'):
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.version_prefix = version_prefix
+        self._lock = Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, user_id, field):
+        raw = self._client.hget(f'{self.prefix}{user_id}', field)
+        if raw is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return json.loads(raw)
+
+    def _version_keys(self, user_id):
+        return f'{self.version_prefix}all', f'{self.version_prefix}{user_id}'
+
+    def version(self, user_id):
+        return tuple(int(v or 0) for v in self._client.mget(self._version_keys(user_id)))
+
+    def set(self, user_id, field, value, version=None):
+        key = f'{self.prefix}{user_id}'
+        version_keys = self._version_keys(user_id)
+        with self._client.pipeline() as pipe:
+            try:
+                #WATCH aborts the write if an invalidation bumps a version in between
+                pipe.watch(*version_keys)
+                if version is not None and tuple(int(v or 0) for v in pipe.mget(version_keys)) != version:
+                    return
+                pipe.multi()
+                pipe.hset(key, field, json.dumps(value))
+                pipe.expire(key, self.ttl)
+                pipe.execute()
+            except redis.WatchError:
+                pass
 
-@app.context_processor
+    def invalidate(self, user_id=None):
+        self._count('invalidations')
+        if user_id is not None:
+            pipe = self._client.pipeline()
+            pipe.incr(f'{self.version_prefix}{user_id}')
+            pipe.delete(f'{self.prefix}{user_id}')
+            pipe.execute()
+            return
+        self._client.incr(f'{self.version_prefix}all')
+        for key in self._client.scan_iter(match=f'{self.prefix}*'):
+            self._client.delete(key)
+
+    def delete(self, user_id, field):
+        pipe = self._client.pipeline()
+        pipe.incr(f'{self.version_prefix}{user_id}')
+        pipe.hdel(f'{self.prefix}{user_id}', field)
+        pipe.execute()
+
+    def info(self):
+        with self._lock:
+            return {'backend': 'redis', 'ttl': self.ttl, **self.stats}
+
+def create_metrics_cache(config):
+    url = config.get('METRICS_CACHE_URL')
+    if url:
+        if redis is None:
+            raise RuntimeError('METRICS_CACHE_URL is set but the redis package is not installed')
+        return RedisCache(url, ttl=config['METRICS_CACHE_TTL'])
+    return LRUCache(max_entries=config['METRICS_CACHE_MAX_ENTRIES'], ttl=config['METRICS_CACHE_TTL'])
+
+metrics_cache = lazy_resource('metrics_cache', lambda app: create_metrics_cache(app.config))
+
+def cached_user_metrics(user_id, field, compute):
+    #cached values are shared between requests and must not be mutated by callers
+    value = metrics_cache.get(user_id, field)
+    if value is None:
+        #the version is read before computing, so an invalidation that lands meanwhile keeps the result out of the cache
+        version = metrics_cache.version(user_id)
+        value = compute()
+        metrics_cache.set(user_id, field, value, version)
+    return value
+
+CACHED_MODELS = (Meal, Workout, BodyMeasurement)
+
+def invalidate_user_cache(user_id=None):
+    metrics_cache.invalidate(user_id)
+
+NOTIFICATION_STATE_FIELD = 'notification_state'
+
+def mark_user_dirty(user_id):
+    #bulk query deletes bypass the flush hook, so callers flag the user explicitly
+    db.session.info.setdefault('dirty_user_ids', set()).add(user_id)
+
+def mark_notifications_dirty(user_ids):
+    db.session.info.setdefault('dirty_notification_user_ids', set()).update(user_ids)
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_dirty_users(session, flush_context):
+    changed, notified = set(), set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, CACHED_MODELS):
+            changed.add(obj.user_id)
+        elif isinstance(obj, Notification):
+            notified.add(obj.user_id)
+    if changed:
+        session.info.setdefault('dirty_user_ids', set()).update(changed)
+    if notified:
+        session.info.setdefault('dirty_notification_user_ids', set()).update(notified)
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_dirty_users(session):
+    for user_id in session.info.pop('dirty_user_ids', ()):
+        invalidate_user_cache(user_id)
+    for user_id in session.info.pop('dirty_notification_user_ids', ()):
+        metrics_cache.delete(user_id, NOTIFICATION_STATE_FIELD)
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_dirty_users(session, previous_transaction):
+    session.info.pop('dirty_user_ids', None)
+    session.info.pop('dirty_notification_user_ids', None)
+
+def query_notification_state(user_id):
+    #latest notification id and unread count, read straight from the database for the /api/notifications ETag
+    latest_id, unread = db.session.query(
+        db.func.max(Notification.id),
+        db.func.coalesce(db.func.sum(db.case((Notification.is_read == False, 1), else_=0)), 0)
+    ).filter(Notification.user_id == user_id).one()
+    return {'latest_id': latest_id or 0, 'unread': unread}
+
+def notification_state(user_id):
+    #cached copy for the unread badge rendered on every page
+    return cached_user_metrics(user_id, NOTIFICATION_STATE_FIELD, lambda: query_notification_state(user_id))
+
+def unread_notifications_count(user_id):
+    return notification_state(user_id)['unread']
+
+@main_bp.cli.command('backfill-rollups')
+@click.option('--user-id', type=int, default=None, help='Only rebuild the rollups of this user.')
+def backfill_rollups_command(user_id):
+    count = rebuild_daily_rollups(user_id)
+    click.echo(f'Rebuilt {count} daily rollup(s)')
+
+def _hot_queries():
+    today = date.today()
+    return [
+        ('meals in range', Meal.query.filter(Meal.user_id == 0, Meal.date >= today, Meal.date <= today)),
+        ('workouts in range', Workout.query.filter(Workout.user_id == 0, Workout.date >= today, Workout.date <= today)),
+        ('latest measurement', BodyMeasurement.query.filter_by(user_id=0).order_by(BodyMeasurement.date.desc(), BodyMeasurement.id.desc()).limit(1)),
+        ('unread notifications', Notification.query.filter_by(user_id=0, is_read=False).order_by(Notification.created_at.desc())),
+        ('meal template lookup', MealTemplate.query.filter_by(user_id=0, name='')),
+        ('workout template lookup', WorkoutTemplate.query.filter_by(user_id=0, name='')),
+        ('rollups in range', DailyRollup.query.filter(DailyRollup.user_id == 0, DailyRollup.date >= today, DailyRollup.date <= today)),
+    ]
+
+def explain_query_plan(query):
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = tuple(None for _ in compiled.positiontup or ())
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params).all()
+    return [row[-1] for row in rows]
+
+@main_bp.cli.command('check-query-plans')
+def check_query_plans_command():
+    failed = 0
+    for label, query in _hot_queries():
+        details = explain_query_plan(query)
+        uses_index = all('USING' in d for d in details if d.startswith(('SCAN', 'SEARCH')))
+        if not uses_index:
+            failed += 1
+        click.echo(f"{'ok' if uses_index else 'FULL SCAN'}  {label}: {'; '.join(details)}")
+    if failed:
+        raise SystemExit(1)
+
+@main_bp.app_context_processor
 def utility_processor():
     unread_count = 0
     try:
         if 'user_id' in session:
-            unread_count = Notification.query.filter_by(user_id=session['user_id'], is_read=False).count()
+            unread_count = unread_notifications_count(session['user_id'])
     except Exception:
         pass
     return {'request': request, 'unread_notifications_count': unread_count}
 
+@main_bp.before_app_request
+def drop_deleted_account_session():
+    #other sessions of an account being deleted must not keep writing rows the purge has already passed;
+    #reads are left alone so pages cost no extra query
+    if 'user_id' not in session or request.method in ('GET', 'HEAD', 'OPTIONS'):
+        return
+    account = db.session.query(User.deleted_at).filter(User.id == session['user_id']).first()
+    if account is None or account.deleted_at is not None:
+        session.clear()
+
 def get_user_id():
     return session.get('user_id')
 
+def get_page_size():
+    page_size = request.args.get('page_size', type=int) or current_app.config['PAGE_SIZE']
+    return max(1, min(page_size, current_app.config['MAX_PAGE_SIZE']))
+
+def keyset_page(query, model, cursor=None, page_size=None, sort_column=None):
+    #newest first; the cursor is the (sort value, id) of the last row of the previous page
+    if page_size is None:
+        page_size = get_page_size()
+    if cursor:
+        try:
+            if sort_column is None:
+                query = query.filter(model.id < int(cursor))
+            else:
+                value, last_id = cursor.split('|')
+                value, last_id = date.fromisoformat(value), int(last_id)
+                query = query.filter(db.or_(sort_column < value, db.and_(sort_column == value, model.id < last_id)))
+        except ValueError:
+            abort(400)
+    order = [model.id.desc()] if sort_column is None else [sort_column.desc(), model.id.desc()]
+    items = query.order_by(*order).limit(page_size + 1).all()
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = str(last.id) if sort_column is None else f'{getattr(last, sort_column.key).isoformat()}|{last.id}'
+    return items, next_cursor
+
+def meals_page(user_id, cursor=None):
+    return keyset_page(Meal.query.filter_by(user_id=user_id), Meal, cursor, sort_column=Meal.date)
+
+def workouts_page(user_id, cursor=None):
+    return keyset_page(Workout.query.filter_by(user_id=user_id), Workout, cursor, sort_column=Workout.date)
+
+def notifications_page(user_id, cursor=None):
+    #created_at is assigned on insert, so id order is creation order
+    notes, next_cursor = keyset_page(Notification.query.filter_by(user_id=user_id), Notification, cursor)
+    for n in notes:
+        n.local_created_at = utc_to_local(n.created_at)
+    return notes, next_cursor
+
 def delete_user_item(model, item_id, user_id, item_name):
     item = model.query.get_or_404(item_id)
     if item.user_id != user_id:
         flash('unauthorized')
         return False
     db.session.delete(item)
+    if model in ROLLUP_MODELS:
+        refresh_daily_rollups(user_id, {item.date})
     db.session.commit()
     flash(f'{item_name} deleted successfully.')
     return True
@@ -169,52 +760,108 @@ def bulk_delete_items(model, item_ids, user_id, item_type):
         return 0
     for item in items:
         db.session.delete(item)
+    if model in ROLLUP_MODELS:
+        refresh_daily_rollups(user_id, {item.date for item in items})
     db.session.commit()
     return len(items)
 
-def create_notification(user_id, message):
+def create_notification(user_id, message, kind=None, period_key=None):
+    #a (kind, period_key) pair already sent to the user violates the unique index and is dropped
+    notification = Notification(user_id=user_id, message=message, kind=kind, period_key=period_key)
+    db.session.add(notification)
     try:
-        notification = Notification(user_id=user_id, message=message)
-        db.session.add(notification)
         db.session.commit()
-        return notification
-    except Exception:
+    except IntegrityError:
         db.session.rollback()
         return None
+    notification_broker.publish(user_id, serialize_notification(notification))
+    return notification
+
+class NotificationBroker:
+    #in-process pub/sub feeding the notification streams; each subscriber gets a bounded queue
+    def __init__(self, max_subscribers=50, queue_size=100):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._count = 0
+        self._lock = Lock()
+
+    def subscribe(self, user_id):
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                return None
+            subscription = queue.Queue(maxsize=self.queue_size)
+            self._subscribers[user_id].add(subscription)
+            self._count += 1
+            return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is None or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            self._count -= 1
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def publish(self, user_id, payload):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait(payload)
+            except queue.Full:
+                pass
+
+    def open_count(self):
+        with self._lock:
+            return self._count
+
+notification_broker = lazy_resource('notification_broker', lambda app: NotificationBroker(max_subscribers=app.config['NOTIFICATION_STREAM_MAX']))
+
+def serialize_notification(n):
+    return {'id': n.id, 'message': n.message, 'created_at': utc_to_local(n.created_at).strftime('%Y-%m-%d %H:%M'), 'is_read': n.is_read}
+
+def unread_notifications_since(user_id, since_id=None):
+    query = Notification.query.filter_by(user_id=user_id, is_read=False)
+    if since_id:
+        query = query.filter(Notification.id > since_id)
+    return query.order_by(Notification.created_at.desc()).all()
 
 def compute_period_metrics(user_id, start_date=None, end_date=None):
     if end_date is None:
         end_date = date.today()
     if start_date is None:
         start_date = end_date - timedelta(days=6)
-    meals = Meal.query.filter(Meal.user_id == user_id, Meal.date >= start_date, Meal.date <= end_date).all()
-    workouts = Workout.query.filter(Workout.user_id == user_id, Workout.date >= start_date, Workout.date <= end_date).all()
+    totals = cached_user_metrics(user_id, f'period:{start_date}:{end_date}',
+                                 lambda: _period_totals(user_id, start_date, end_date))
+    return {'start_date': start_date, 'end_date': end_date, **totals}
 
-    calories_consumed = sum(m.calories for m in meals)
-    protein = sum(m.protein for m in meals)
-    carbs = sum(m.carbs for m in meals)
-    fats = sum(m.fats for m in meals)
-    calories_burned = sum(w.calories_burned for w in workouts)
-    workout_volume = sum((w.sets or 0) * (w.reps or 0) * (w.weight or 0) for w in workouts)
+PERIOD_TOTAL_FIELDS = ('calories_consumed', 'protein', 'carbs', 'fats', 'calories_burned', 'workout_volume')
 
-    return {
-        'start_date': start_date,
-        'end_date': end_date,
-        'calories_consumed': calories_consumed,
-        'protein': protein,
-        'carbs': carbs,
-        'fats': fats,
-        'calories_burned': calories_burned,
-        'workout_volume': workout_volume
-    }
+def _period_totals_columns():
+    return [db.func.coalesce(db.func.sum(getattr(DailyRollup, field)), 0) for field in PERIOD_TOTAL_FIELDS]
+
+def _period_totals(user_id, start_date, end_date):
+    row = db.session.query(*_period_totals_columns()).filter(
+        DailyRollup.user_id == user_id, DailyRollup.date >= start_date, DailyRollup.date <= end_date).one()
+    return dict(zip(PERIOD_TOTAL_FIELDS, row))
+
+def compute_period_metrics_for_users(user_ids, start_date, end_date):
+    #one grouped query for a whole batch of users; users without rollups get zero totals
+    rows = db.session.query(DailyRollup.user_id, *_period_totals_columns()).filter(
+        DailyRollup.user_id.in_(user_ids), DailyRollup.date >= start_date, DailyRollup.date <= end_date
+    ).group_by(DailyRollup.user_id).all()
+    totals = {row[0]: dict(zip(PERIOD_TOTAL_FIELDS, row[1:])) for row in rows}
+    zero = dict.fromkeys(PERIOD_TOTAL_FIELDS, 0)
+    return {user_id: {'start_date': start_date, 'end_date': end_date, **totals.get(user_id, zero)} for user_id in user_ids}
 
-def _notification_exists_on_date(user_id, text_substr, when_date=None):
-    if when_date is None:
-        when_date = date.today()
-    existing = Notification.query.filter(Notification.user_id == user_id,
-                                         Notification.message.contains(text_substr),
-                                         db.func.date(Notification.created_at) == when_date).first()
-    return existing is not None
+def notification_exists(user_id, kind, period_key):
+    return db.session.query(Notification.id).filter_by(user_id=user_id, kind=kind, period_key=period_key).first() is not None
+
+def week_key(day):
+    return day.strftime('%Y-W%W')
 
 def check_low_protein(user_id):
     today = date.today()
@@ -224,9 +871,10 @@ def check_low_protein(user_id):
         target = bm.weight * 1.2
     else:
         target = 50
-    if protein_today < target and not _notification_exists_on_date(user_id, 'Low protein today'):
+    if protein_today < target and not notification_exists(user_id, 'low_protein', today.isoformat()):
         percent_of_target = int((protein_today / target) * 100) if target > 0 else 0
-        create_notification(user_id, f'Low protein today: {protein_today:.1f} g ({percent_of_target}% of target {int(target)} g). Consider adding a protein-rich meal.')
+        create_notification(user_id, f'Low protein today: {protein_today:.1f} g ({percent_of_target}% of target {int(target)} g). Consider adding a protein-rich meal.',
+                            kind='low_protein', period_key=today.isoformat())
 
 
 def check_training_volume_trend(user_id):
@@ -240,64 +888,44 @@ def check_training_volume_trend(user_id):
         return  
     volume_diff = current_week_volume - previous_week_volume
     percent_change = (volume_diff / previous_week_volume) * 100
-    if percent_change < -20:
-        week_ago = today - timedelta(days=7)
-        existing = Notification.query.filter(
-            Notification.user_id == user_id,
-            Notification.message.contains('training volume decreased'),
-            db.func.date(Notification.created_at) >= week_ago
-        ).first()
-        if not existing:
-            create_notification(user_id, f'Training volume decreased {abs(int(percent_change))}% vs previous week. Consider adjusting your program.')
+    if percent_change < -20 and not notification_exists(user_id, 'volume_drop', week_key(today)):
+        create_notification(user_id, f'Training volume decreased {abs(int(percent_change))}% vs previous week. Consider adjusting your program.',
+                            kind='volume_drop', period_key=week_key(today))
 
 
 def create_summary_for_user(user, start, end, summary_type='Weekly'):
     current_metrics = compute_period_metrics(user.id, start_date=start, end_date=end)
-    protein_calories = current_metrics['protein'] * 4
-    carbohydrate_calories = current_metrics['carbs'] * 4
-    fat_calories = current_metrics['fats'] * 9
-    total_macro_calories = protein_calories + carbohydrate_calories + fat_calories
-    if total_macro_calories > 0:
-        protein_percent = round((protein_calories / total_macro_calories) * 100, 1)
-        carbohydrate_percent = round((carbohydrate_calories / total_macro_calories) * 100, 1)
-        fat_percent = round((fat_calories / total_macro_calories) * 100, 1)
-    else:
-        protein_percent = carbohydrate_percent = fat_percent = 0
-
-    current_volume = current_metrics['workout_volume']
     #compare with same length period before this one
+    previous_start, previous_end = previous_period(start, end)
+    previous_metrics = compute_period_metrics(user.id, start_date=previous_start, end_date=previous_end)
+    return create_notification(user.id, format_summary_message(summary_type, start, end, current_metrics, previous_metrics),
+                               kind=summary_kind(summary_type), period_key=start.isoformat())
+
+def summary_kind(summary_type):
+    return f'{summary_type.lower()}_summary'
+
+def previous_period(start, end):
     period_length = (end - start).days + 1
     previous_end = start - timedelta(days=1)
-    previous_start = previous_end - timedelta(days=period_length - 1)
-    previous_metrics = compute_period_metrics(user.id, start_date=previous_start, end_date=previous_end)
-    previous_volume = previous_metrics['workout_volume']
-    trend = 'unchanged'
-    if previous_volume == 0 and current_volume > 0:
-        trend = 'increased'
-    elif previous_volume == 0 and current_volume == 0:
-        trend = 'unchanged'
-    elif previous_volume > 0:
-        percent_change = (current_volume - previous_volume) / previous_volume * 100
-        if percent_change > 5:
-            trend = 'increased'
-        elif percent_change < -5:
-            trend = 'decreased'
-        else:
-            trend = 'unchanged'
+    return previous_end - timedelta(days=period_length - 1), previous_end
 
-    message = (
+def format_summary_message(summary_type, start, end, current_metrics, previous_metrics):
+    protein_percent, carbohydrate_percent, fat_percent = _macro_percentages(
+        current_metrics['protein'], current_metrics['carbs'], current_metrics['fats'])
+    current_volume = current_metrics['workout_volume']
+    trend = _volume_trend(current_volume, previous_metrics['workout_volume'])
+    return (
         f"{summary_type} Summary ({start} → {end}): Calories consumed {current_metrics['calories_consumed']} kcal, "
         f"Calories burned {current_metrics['calories_burned']} kcal. Macros: Protein {protein_percent}%, Carbs {carbohydrate_percent}%, Fats {fat_percent}%. "
         f"Workout volume {current_volume} ({trend} vs previous period)."
     )
-    return create_notification(user.id, message)
 
 
-@app.route('/')
+@main_bp.route('/')
 def index():
     return render_template('index.html', hide_back_button=True)
 
-@app.route('/register', methods=['GET','POST'])
+@auth_bp.route('/register', methods=['GET','POST'])
 def register():
     if request.method == 'POST':
         username = request.form['username'].strip()
@@ -306,21 +934,21 @@ def register():
         
         if not username or not password:
             flash('Please enter username and password')
-            return redirect(url_for('register'))
+            return redirect(url_for('auth.register'))
             
         if password != confirm_password:
             flash('Passwords do not match')
-            return redirect(url_for('register'))
+            return redirect(url_for('auth.register'))
         if User.query.filter_by(username=username).first():
             flash('Username already exists')
-            return redirect(url_for('register'))
+            return redirect(url_for('auth.register'))
             
         security_question = request.form['security_question']
         security_answer = request.form['security_answer'].strip()
         
         if not security_answer:
             flash('Security answer is required')
-            return redirect(url_for('register'))
+            return redirect(url_for('auth.register'))
             
         user = User(
             username=username,
@@ -331,150 +959,71 @@ def register():
         db.session.add(user)
         db.session.commit()
         flash('Account created. Please log in.')
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     return render_template('register.html')
 
-@app.route('/login', methods=['GET','POST'])
+@auth_bp.route('/login', methods=['GET','POST'])
 def login():
     if request.method=='POST':
         username = request.form['username'].strip() 
         password = request.form['password']
         user = User.query.filter_by(username=username).first()
         if user and check_password_hash(user.password, password):
+            if user.deleted_at is not None:
+                flash('This account is being deleted')
+                return render_template('login.html')
             session['user_id'] = user.id
             try:
                 if user.meal_reminder or user.workout_reminder:
-                    timer = Timer(10, send_delayed_login_notifications, args=[user.id])
-                    timer.daemon = True 
-                    timer.start()
-
-                try:
-                    check_low_protein(user.id)
-                except Exception:
-                    pass
-                try:
-                    check_training_volume_trend(user.id)
-                except Exception:
-                    pass
-
-                pref = user.progress_summary_frequency or 'weekly'
-                if pref == 'daily':
-                    send_daily_summary_for_user(user)
-                elif pref == 'weekly':
-                    send_weekly_summary_for_user(user)
-                elif pref == 'monthly':
-                    send_monthly_summary_for_user(user)
+                    notification_scheduler.schedule(('daily_reminders', user.id), current_app.config['LOGIN_REMINDER_DELAY'],
+                                                    send_delayed_login_notifications, user.id)
+                enqueue_login_notifications(user.id)
             except Exception:
                 pass
 
             flash('Welcome back, ' + username + '!')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
         flash('invalid credentials')
     return render_template('login.html')
 
-@app.route('/dashboard')
+@main_bp.route('/dashboard')
 def dashboard():
     user_id = get_user_id()
     if not user_id:
         flash('please log in to view your dashboard')
-        return redirect(url_for('login'))
-
-    today = date.today()
-    today_meals = Meal.query.filter_by(user_id=session['user_id'], date=today).all()
-    total_cal = sum(m.calories for m in today_meals)
-    meals_count = len(today_meals)
-
-    today_workouts = Workout.query.filter_by(user_id=session['user_id'], date=today).all()
-    workout_cal = sum(w.calories_burned for w in today_workouts)
-    workouts_count = len(today_workouts)
-
-    week_ago = today - timedelta(days=6)
-    week_meals = Meal.query.filter(Meal.user_id == session['user_id']).filter(Meal.date >= week_ago).all()
-    weekly_cal = sum(m.calories for m in week_meals)
-
-    week_workouts = Workout.query.filter(Workout.user_id == session['user_id']).filter(Workout.date >= week_ago).all()
-    weekly_workout_cal = sum(w.calories_burned for w in week_workouts)
-
-    today_meals = Meal.query.filter_by(user_id=user_id, date=today).all()
-    daily_macros = {
-        'protein': sum(m.protein for m in today_meals),
-        'carbs': sum(m.carbs for m in today_meals),
-        'fats': sum(m.fats for m in today_meals),
-    }
-    
-    bm = BodyMeasurement.query.filter_by(user_id=user_id).order_by(BodyMeasurement.date.desc(), BodyMeasurement.id.desc()).first()
-    if bm and bm.weight:
-        protein_target_grams = round(bm.weight * 1.2, 1)
-    else:
-        protein_target_grams = 50.0
-    protein_today_grams = daily_macros['protein']
-    try:
-        protein_target_pct = min(100.0, round((protein_today_grams / protein_target_grams) * 100.0, 1)) if protein_target_grams > 0 else 0.0
-    except Exception:
-        protein_target_pct = 0.0
-    
-    if bm and bm.weight:
-        carb_target_grams = round(bm.weight * 5.0, 1)
-        fat_target_grams = round(bm.weight * 1.0, 1)
-    else:
-        carb_target_grams = 250.0
-        fat_target_grams = 50.0
-    carb_today_grams = daily_macros['carbs']
-    fat_today_grams = daily_macros['fats']
-    try:
-        carb_target_pct = min(100.0, round((carb_today_grams / carb_target_grams) * 100.0, 1)) if carb_target_grams > 0 else 0.0
-    except Exception:
-        carb_target_pct = 0.0
-    try:
-        fat_target_pct = min(100.0, round((fat_today_grams / fat_target_grams) * 100.0, 1)) if fat_target_grams > 0 else 0.0
-    except Exception:
-        fat_target_pct = 0.0
+        return redirect(url_for('auth.login'))
 
     return render_template('dashboard.html',
-        total_cal=total_cal,
-        meals_count=meals_count,
-        workout_cal=workout_cal,
-        workouts_count=workouts_count,
-        weekly_cal=weekly_cal,
-        weekly_workout_cal=weekly_workout_cal,
-        today_date=today.isoformat(),
-        protein_target_grams=protein_target_grams,
-        protein_today_grams=protein_today_grams,
-        protein_target_pct=protein_target_pct,
-        carb_target_grams=carb_target_grams,
-        carb_today_grams=carb_today_grams,
-        carb_target_pct=carb_target_pct,
-        fat_target_grams=fat_target_grams,
-        fat_today_grams=fat_today_grams,
-        fat_target_pct=fat_target_pct,
-        daily_macros=daily_macros,
-        hide_back_button=True)
-
-@app.route('/meals', methods=['GET','POST'])
+        today_date=date.today().isoformat(),
+        hide_back_button=True,
+        **get_dashboard_snapshot(user_id))
+
+@meals_bp.route('/meals', methods=['GET','POST'])
 def meals():
     user_id = get_user_id()
     if not user_id:
         flash('please log in to view your meals')
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
 
     if request.method == 'POST':
         if 'template_id' in request.form:
             template = MealTemplate.query.get_or_404(request.form['template_id'])
             if template.user_id != user_id:
                 flash('invalid template')
-                return redirect(url_for('meals'))
+                return redirect(url_for('meals.meals'))
             m = Meal(user_id=user_id, name=template.name, calories=template.calories,
                     protein=template.protein, carbs=template.carbs, fats=template.fats)
             template.frequency += 1
             db.session.add(m)
+            refresh_daily_rollups(user_id, {date.today()})
             db.session.commit()
             flash(f'Added {template.name}')
-            return redirect(url_for('meals'))
+            return redirect(url_for('meals.meals'))
 
         name = request.form['name'].strip() #meal addition
         if not name:
             flash('Meal name required')
-            return redirect(url_for('meals'))
+            return redirect(url_for('meals.meals'))
         try:
             qty = int(request.form.get('quantity', 1))
             m = Meal(user_id=user_id, name=name, quantity=qty,
@@ -487,6 +1036,7 @@ def meals():
                                        float(request.form.get('protein', 0)),
                                        float(request.form.get('carbs', 0)),
                                        float(request.form.get('fats', 0)))
+            refresh_daily_rollups(user_id, {date.today()})
             db.session.commit()
             try:
                 check_low_protein(user_id)
@@ -495,72 +1045,147 @@ def meals():
             flash('Meal added')
         except ValueError:
             flash('Invalid values')
-        return redirect(url_for('meals'))
+        return redirect(url_for('meals.meals'))
 
-    meals_data = Meal.query.filter_by(user_id=user_id).order_by(Meal.id.desc()).all()
+    meals_data, next_cursor = meals_page(user_id)
     favorites = Meal.query.filter_by(user_id=user_id, is_favorite=True).order_by(Meal.date.desc()).all()
     frequent = MealTemplate.query.filter_by(user_id=user_id).order_by(MealTemplate.frequency.desc()).limit(5).all()
-    return render_template('meals.html', meals=meals_data, favorites=favorites,
+    return render_template('meals.html', meals=meals_data, next_cursor=next_cursor, favorites=favorites,
                           suggestions=favorites + [t for t in frequent if t.name not in {f.name for f in favorites}])
 
 
 
 
-@app.route('/toggle_favorite_meal/<int:meal_id>', methods=['POST'])
+def parse_meal_entry(entry):
+    #same rules as the meals form; template values are per serving, meal values are scaled by quantity
+    name = str(entry.get('name') or '').strip()
+    if not name:
+        raise ValueError('Meal name required')
+    try:
+        qty = int(entry.get('quantity', 1))
+        calories = int(entry['calories'])
+        protein = float(entry.get('protein', 0))
+        carbs = float(entry.get('carbs', 0))
+        fats = float(entry.get('fats', 0))
+        day = datetime.strptime(entry['date'], '%Y-%m-%d').date() if entry.get('date') else date.today()
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Invalid values')
+    meal = {'name': name, 'quantity': qty, 'calories': calories * qty, 'protein': protein * qty,
+            'carbs': carbs * qty, 'fats': fats * qty, 'date': day}
+    template = {'name': name, 'calories': calories, 'protein': protein, 'carbs': carbs, 'fats': fats}
+    return meal, template
+
+def upsert_templates(model, user_id, templates, update_columns=()):
+    #one INSERT .. ON CONFLICT for the whole batch; the last entry for a name wins and frequency grows by its count
+    if not templates:
+        return
+    merged = {}
+    for t in templates:
+        frequency = t.get('frequency', 1) + (merged[t['name']]['frequency'] if t['name'] in merged else 0)
+        merged[t['name']] = dict(t, user_id=user_id, frequency=frequency)
+    rows = list(merged.values())
+    #chunked so large imports stay under sqlite's bound parameter limit
+    for i in range(0, len(rows), 500):
+        stmt = sqlite_insert(model).values(rows[i:i + 500])
+        set_ = {column: stmt.excluded[column] for column in update_columns}
+        set_['frequency'] = model.frequency + stmt.excluded.frequency
+        db.session.execute(stmt.on_conflict_do_update(index_elements=[model.user_id, model.name], set_=set_))
+
+@meals_bp.route('/api/meals/batch', methods=['POST'])
+def api_meals_batch():
+    if 'user_id' not in session:
+        return {'error': 'login required'}, 401
+    user_id = session['user_id']
+    payload = request.get_json(silent=True)
+    entries = payload.get('meals') if isinstance(payload, dict) else payload
+    if not isinstance(entries, list) or not entries:
+        return {'error': 'expected a non-empty list of meals'}, 400
+    if len(entries) > current_app.config['MAX_BATCH_SIZE']:
+        return {'error': f"at most {current_app.config['MAX_BATCH_SIZE']} meals per batch"}, 413
+
+    meals, templates, errors = [], [], []
+    for index, entry in enumerate(entries):
+        try:
+            if not isinstance(entry, dict):
+                raise ValueError('Invalid values')
+            meal, template = parse_meal_entry(entry)
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+            continue
+        meals.append(dict(meal, user_id=user_id))
+        templates.append(template)
+    if errors:
+        return {'errors': errors}, 400
+
+    db.session.bulk_insert_mappings(Meal, meals)
+    upsert_templates(MealTemplate, user_id, templates, ('calories', 'protein', 'carbs', 'fats'))
+    days = {m['date'] for m in meals}
+    refresh_daily_rollups(user_id, days)
+    mark_user_dirty(user_id)
+    db.session.commit()
+    if date.today() in days:
+        try:
+            check_low_protein(user_id)
+        except:
+            pass
+    return {'created': len(meals)}, 201
+
+@meals_bp.route('/toggle_favorite_meal/<int:meal_id>', methods=['POST'])
 def toggle_favorite_meal(meal_id):
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     meal = Meal.query.get_or_404(meal_id)
     meal.is_favorite = not meal.is_favorite
     db.session.commit()
     flash(f'{"Favorite Marked" if meal.is_favorite else "Removed"} {meal.name} {"as favorite" if meal.is_favorite else "from favorites"}')
-    return redirect(url_for('meals'))
+    return redirect(url_for('meals.meals'))
 
-@app.route('/edit_meal/<int:meal_id>', methods=['GET', 'POST'])
+@meals_bp.route('/edit_meal/<int:meal_id>', methods=['GET', 'POST'])
 def edit_meal(meal_id):
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     meal = Meal.query.get_or_404(meal_id)
     if meal.user_id != user_id:
         flash('Unauthorized')
-        return redirect(url_for('meals'))
+        return redirect(url_for('meals.meals'))
     if request.method == 'POST':
         meal.name = request.form['name']
         meal.calories = int(request.form.get('calories', 0))
         meal.protein = float(request.form.get('protein', 0))
         meal.carbs = float(request.form.get('carbs', 0))
         meal.fats = float(request.form.get('fats', 0))
+        refresh_daily_rollups(user_id, {meal.date})
         db.session.commit()
         flash('Meal updated.')
-        return redirect(url_for('meals'))
+        return redirect(url_for('meals.meals'))
     return render_template('edit_meal.html', meal=meal)
 
-@app.route('/delete_meal/<int:meal_id>', methods=['POST'])
+@meals_bp.route('/delete_meal/<int:meal_id>', methods=['POST'])
 def delete_meal(meal_id):
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     delete_user_item(Meal, meal_id, user_id, 'Meal')
-    return redirect(url_for('meals'))
+    return redirect(url_for('meals.meals'))
 
-@app.route('/remove_template/<int:template_id>', methods=['POST'])
+@meals_bp.route('/remove_template/<int:template_id>', methods=['POST'])
 def remove_template(template_id):
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     delete_user_item(MealTemplate, template_id, user_id, 'Favorite')
-    return redirect(url_for('meals'))
+    return redirect(url_for('meals.meals'))
 
-@app.route('/bulk_delete_meals', methods=['POST'])
+@meals_bp.route('/bulk_delete_meals', methods=['POST'])
 def bulk_delete_meals():
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     count = bulk_delete_items(Meal, request.form.getlist('meal_ids'), user_id, 'meals')
     flash(f'Deleted {count} meal(s)')
-    return redirect(url_for('meals'))
+    return redirect(url_for('meals.meals'))
 
 SECURITY_QUESTIONS = {
     'maiden_name': "What is your mother's maiden name?",
@@ -569,15 +1194,15 @@ SECURITY_QUESTIONS = {
     'school': "What was your first school's name?"
 }
 
-@app.route('/reset_password', methods=['GET', 'POST'])
+@auth_bp.route('/reset_password', methods=['GET', 'POST'])
 def reset_password():
     if request.method == 'POST':
         username = request.form['username'].strip()
-        user = User.query.filter_by(username=username).first()
+        user = User.query.filter_by(username=username, deleted_at=None).first()
         
         if not user:
             flash('Username not found')
-            return redirect(url_for('reset_password'))
+            return redirect(url_for('auth.reset_password'))
         
         if 'verified' in request.form and 'password' in request.form:
             password = request.form['password']
@@ -593,7 +1218,7 @@ def reset_password():
             user.password = generate_password_hash(password)
             db.session.commit()
             flash('Password has been reset. Please login.')
-            return redirect(url_for('login'))
+            return redirect(url_for('auth.login'))
             
         if 'security_answer' in request.form:
             security_answer = request.form['security_answer']
@@ -616,19 +1241,19 @@ def reset_password():
             
     return render_template('reset_password.html', user=None)
 
-@app.route('/workouts', methods=['GET','POST'])
+@workouts_bp.route('/workouts', methods=['GET','POST'])
 def workouts():
     user_id = get_user_id()
     if not user_id:
         flash('please log in to view your workouts')
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
 
     if request.method == 'POST':
         if 'template_id' in request.form:
             template = WorkoutTemplate.query.get_or_404(request.form['template_id'])
             if template.user_id != session['user_id']:
                 flash('Invalid template')
-                return redirect(url_for('workouts'))
+                return redirect(url_for('workouts.workouts'))
 
             if template.is_custom:
                 exercise_type = template.exercise_type
@@ -654,10 +1279,10 @@ def workouts():
                             weight_value = float(weight_str)
                         except ValueError:
                             flash('Invalid weight value')
-                            return redirect(url_for('workouts'))
+                            return redirect(url_for('workouts.workouts'))
                         if weight_value != 0:
                             flash('Cardio exercises must not include a weight')
-                            return redirect(url_for('workouts'))
+                            return redirect(url_for('workouts.workouts'))
                     sets = 0
                     reps = 0
                 else: 
@@ -668,12 +1293,12 @@ def workouts():
                         weight = float(weight_str)
                     except ValueError:
                         flash('Invalid weight value')
-                        return redirect(url_for('workouts'))
+                        return redirect(url_for('workouts.workouts'))
                     volume = sets * reps * weight
                     duration = 0
             except Exception:
                 flash('Invalid input values')
-                return redirect(url_for('workouts'))
+                return redirect(url_for('workouts.workouts'))
 
             intensity = float(request.form.get('intensity', 1.0))
             if template.is_custom:
@@ -699,18 +1324,19 @@ def workouts():
             )
             template.frequency += 1
             db.session.add(w)
+            refresh_daily_rollups(session['user_id'], {date.today()})
             db.session.commit()
             try:
                 check_training_volume_trend(session['user_id'])
             except Exception:
                 pass
             flash(f'Added {template.name} from frequent workouts')
-            return redirect(url_for('workouts'))
+            return redirect(url_for('workouts.workouts'))
 
         name = request.form['name'].strip()
         if not name:
             flash('Exercise name is required')
-            return redirect(url_for('workouts'))
+            return redirect(url_for('workouts.workouts'))
 
         is_custom = request.form.get('is_custom') == 'true'
 
@@ -732,11 +1358,11 @@ def workouts():
                 duration_str = request.form.get('duration', '0').strip()
                 if not duration_str:
                     flash('Duration is required for cardio exercises')
-                    return redirect(url_for('workouts'))
+                    return redirect(url_for('workouts.workouts'))
                 duration = int(duration_str)
                 if duration <= 0:
                     flash('Duration must be greater than 0 for cardio exercises')
-                    return redirect(url_for('workouts'))
+                    return redirect(url_for('workouts.workouts'))
                 weight_str = request.form.get('weight', '').strip()
                 if weight_str:
                     try:
@@ -745,7 +1371,7 @@ def workouts():
                         weight_value = None
                     if weight_value not in (None, 0):
                         flash('Cardio exercises must not include a weight')
-                        return redirect(url_for('workouts'))
+                        return redirect(url_for('workouts.workouts'))
                 sets = 0
                 reps = 0
             else: 
@@ -753,24 +1379,24 @@ def workouts():
                 reps = int(request.form.get('reps', '0').strip())
                 if sets <= 0 or reps <= 0:
                     flash('Sets and reps must be greater than 0 for strength exercises')
-                    return redirect(url_for('workouts'))
+                    return redirect(url_for('workouts.workouts'))
                 duration = 0
                 weight_str = request.form.get('weight', '').strip()
                 if weight_str == '':
                     flash('Weight is required for strength exercises (enter 0 for bodyweight)')
-                    return redirect(url_for('workouts'))
+                    return redirect(url_for('workouts.workouts'))
                 try:
                     weight = float(weight_str)
                 except ValueError:
                     flash('Invalid weight value')
-                    return redirect(url_for('workouts'))
+                    return redirect(url_for('workouts.workouts'))
                 if weight < 0:
                     flash('Weight must be 0 or greater')
-                    return redirect(url_for('workouts'))
+                    return redirect(url_for('workouts.workouts'))
                 volume = sets * reps * weight
         except Exception:
             flash('Invalid input values')
-            return redirect(url_for('workouts'))
+            return redirect(url_for('workouts.workouts'))
 
         intensity = float(request.form.get('intensity', 1.0))
         if is_custom:
@@ -804,15 +1430,16 @@ def workouts():
             is_custom=is_custom,
             calories_per_hour=calories_per_hour if is_custom else 0
         )
+        refresh_daily_rollups(session['user_id'], {date.today()})
         db.session.commit()
         try:
             check_training_volume_trend(session['user_id'])
         except Exception:
             pass
         flash('Workout added')
-        return redirect(url_for('workouts'))
+        return redirect(url_for('workouts.workouts'))
 
-    workouts = Workout.query.filter_by(user_id=session['user_id']).order_by(Workout.id.desc()).all()
+    workouts, next_cursor = workouts_page(session['user_id'])
     manual_favorites = Workout.query.filter_by(user_id=session['user_id'], is_favorite=True).order_by(Workout.date.desc()).all()
     
     all_customs = WorkoutTemplate.query.filter_by(user_id=session['user_id'], is_custom=True).order_by(WorkoutTemplate.frequency.desc()).all()
@@ -822,10 +1449,17 @@ def workouts():
 
     customs = all_customs + frequent_exercises
     custom_workouts_only = all_customs
-
+    #the display defaults below must not be flushed back to the templates
+    for t in customs:
+        db.session.expunge(t)
+
+    favorite_templates = {}
+    if manual_favorites:
+        favorite_templates = dict(db.session.query(WorkoutTemplate.name, WorkoutTemplate.id).filter(
+            WorkoutTemplate.user_id == session['user_id'],
+            WorkoutTemplate.name.in_({f.name for f in manual_favorites})).all())
     for f in manual_favorites:
-        template = WorkoutTemplate.query.filter_by(user_id=session['user_id'], name=f.name).first()
-        f.template_id = template.id if template else None
+        f.template_id = favorite_templates.get(f.name)
 
     favorite_names = {f.name for f in manual_favorites}
     dropdown_customs = [t for t in customs if t.name not in favorite_names]
@@ -849,44 +1483,143 @@ def workouts():
         exercise_data = get_exercise_data(f.name)
         f.calories_per_hour = exercise_data.get('calories_per_30_min', 150) * 2
 
+    return render_template('workouts.html', workouts=workouts, next_cursor=next_cursor, favorites=manual_favorites, customs=dropdown_customs, frequent=frequent_exercises, custom_workouts_only=custom_workouts_only, all_exercises=exercise_catalog.current().listing)
 
-    all_exercises = []
-    exercises_data = load_exercises_from_csv()
-    for name, data in exercises_data.items():
-        benefit = data.get('benefit', '')
-        short_benefit = benefit[:50] + '...' if len(benefit) > 50 else benefit
-
-        all_exercises.append({
-            'name': name.title(),
-            'exercise_type': data['exercise_type'],
-            'muscle_groups': data['muscle_groups'],
-            'calories_per_hour': data['calories_per_30_min'] * 2,
-            'benefit': short_benefit
-        })
+def _entry_number(entry, key, cast, default=0):
+    try:
+        return cast(entry.get(key, default))
+    except (TypeError, ValueError):
+        raise ValueError('Invalid input values')
+
+def is_custom_entry(entry):
+    return entry.get('is_custom') in (True, 1, 'true', 'True', '1')
+
+def parse_workout_entry(entry, catalog_data):
+    #same rules as the manual workout form; calories are filled in later for the whole session
+    name = str(entry.get('name') or '').strip()
+    if not name:
+        raise ValueError('Exercise name is required')
+    is_custom = is_custom_entry(entry)
+    workout = {'name': name, 'is_custom': is_custom, 'intensity': _entry_number(entry, 'intensity', float, 1.0)}
+    if is_custom:
+        calories_per_hour = _entry_number(entry, 'custom_calories_per_hour', int)
+        exercise_data = {
+            'exercise_type': entry.get('custom_type') or 'strength',
+            'muscle_groups': entry.get('custom_muscle_groups') or '',
+            'calories_per_30_min': calories_per_hour // 2
+        }
+        workout['calories_per_hour'] = calories_per_hour
+    else:
+        exercise_data = catalog_data[name.lower()]
+    workout['exercise_data'] = exercise_data
+    workout['exercise_type'] = exercise_data.get('exercise_type', 'strength')
+    workout['muscle_groups'] = exercise_data.get('muscle_groups', '')
+    if workout['exercise_type'] == 'cardio':
+        duration = _entry_number(entry, 'duration', int)
+        if duration <= 0:
+            raise ValueError('Duration must be greater than 0 for cardio exercises')
+        if entry.get('weight') not in (None, '') and _entry_number(entry, 'weight', float) != 0:
+            raise ValueError('Cardio exercises must not include a weight')
+        workout.update(duration=duration, sets=0, reps=0, weight=0, volume=0)
+    else:
+        sets, reps = _entry_number(entry, 'sets', int), _entry_number(entry, 'reps', int)
+        if sets <= 0 or reps <= 0:
+            raise ValueError('Sets and reps must be greater than 0 for strength exercises')
+        if entry.get('weight') in (None, ''):
+            raise ValueError('Weight is required for strength exercises (enter 0 for bodyweight)')
+        weight = _entry_number(entry, 'weight', float)
+        if weight < 0:
+            raise ValueError('Weight must be 0 or greater')
+        workout.update(duration=0, sets=sets, reps=reps, weight=weight, volume=sets * reps * weight)
+    return workout
+
+def compute_session_calories(workouts):
+    for w in workouts:
+        if w['is_custom'] and w['exercise_type'] == 'cardio':
+            w['calories_burned'] = (w['calories_per_hour'] * w['duration']) // 60
+        else:
+            w['calories_burned'] = calculate_calories_burned(w['exercise_data'], w['duration'], w['sets'], w['reps'], w['intensity'])
+    return workouts
 
-    return render_template('workouts.html', workouts=workouts, favorites=manual_favorites, customs=dropdown_customs, frequent=frequent_exercises, custom_workouts_only=custom_workouts_only, all_exercises=all_exercises)
+@workouts_bp.route('/api/workouts/session', methods=['POST'])
+def api_workout_session():
+    if 'user_id' not in session:
+        return {'error': 'login required'}, 401
+    user_id = session['user_id']
+    payload = request.get_json(silent=True)
+    entries = payload.get('exercises') if isinstance(payload, dict) else payload
+    if not isinstance(entries, list) or not entries:
+        return {'error': 'expected a non-empty list of exercises'}, 400
+    if len(entries) > current_app.config['MAX_BATCH_SIZE']:
+        return {'error': f"at most {current_app.config['MAX_BATCH_SIZE']} exercises per session"}, 413
+    try:
+        day = datetime.strptime(payload['date'], '%Y-%m-%d').date() if isinstance(payload, dict) and payload.get('date') else date.today()
+    except (TypeError, ValueError):
+        return {'error': 'Invalid date'}, 400
+
+    #each distinct catalog exercise is looked up once for the whole session
+    catalog_data = {}
+    for entry in entries:
+        if isinstance(entry, dict) and not is_custom_entry(entry):
+            name = str(entry.get('name') or '').strip().lower()
+            if name and name not in catalog_data:
+                catalog_data[name] = get_exercise_data(name)
+
+    parsed, errors = [], []
+    for index, entry in enumerate(entries):
+        try:
+            if not isinstance(entry, dict):
+                raise ValueError('Invalid input values')
+            parsed.append(parse_workout_entry(entry, catalog_data))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+    if errors:
+        return {'errors': errors}, 400
+
+    compute_session_calories(parsed)
+    db.session.bulk_insert_mappings(Workout, [{
+        'user_id': user_id, 'date': day, 'name': w['name'], 'exercise_type': w['exercise_type'],
+        'muscle_groups': w['muscle_groups'], 'duration': w['duration'], 'sets': w['sets'], 'reps': w['reps'],
+        'weight': w['weight'], 'volume': w['volume'], 'intensity': w['intensity'], 'calories_burned': w['calories_burned']
+    } for w in parsed])
+    upsert_templates(WorkoutTemplate, user_id, [{
+        'name': w['name'], 'exercise_type': w['exercise_type'], 'muscle_groups': w['muscle_groups'],
+        'is_custom': w['is_custom'], 'calories_per_hour': w.get('calories_per_hour', 0)
+    } for w in parsed])
+    refresh_daily_rollups(user_id, {day})
+    mark_user_dirty(user_id)
+    db.session.commit()
+    try:
+        check_training_volume_trend(user_id)
+    except Exception:
+        pass
+    return {
+        'created': len(parsed),
+        'calories_burned': sum(w['calories_burned'] for w in parsed),
+        'volume': sum(w['volume'] for w in parsed)
+    }, 201
 
 
-@app.route('/toggle_favorite_workout/<int:workout_id>', methods=['POST'])
+@workouts_bp.route('/toggle_favorite_workout/<int:workout_id>', methods=['POST'])
 def toggle_favorite_workout(workout_id):
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     workout = Workout.query.get_or_404(workout_id)
     workout.is_favorite = not workout.is_favorite
     db.session.commit()
     flash(f'{"Favorite Marked" if workout.is_favorite else "Removed"} {workout.name} {"as favorite" if workout.is_favorite else "from favorites"}')
-    return redirect(url_for('workouts'))
+    return redirect(url_for('workouts.workouts'))
 
-@app.route('/edit_workout/<int:workout_id>', methods=['GET', 'POST'])
+@workouts_bp.route('/edit_workout/<int:workout_id>', methods=['GET', 'POST'])
 def edit_workout(workout_id):
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     workout = Workout.query.get_or_404(workout_id)
     if workout.user_id != user_id:
         flash('Unauthorized')
-        return redirect(url_for('workouts'))
+        return redirect(url_for('workouts.workouts'))
     if request.method == 'POST':
         try:
             workout.name = request.form['name']
@@ -902,59 +1635,60 @@ def edit_workout(workout_id):
                 workout.volume = workout.sets * workout.reps * workout.weight
             exercise_data = get_exercise_data(workout.name)
             workout.calories_burned = calculate_calories_burned(exercise_data, workout.duration, workout.sets, workout.reps, workout.intensity)
+            refresh_daily_rollups(user_id, {workout.date})
             db.session.commit()
             flash('Workout updated.')
         except (ValueError, KeyError):
             flash('Invalid values')
-        return redirect(url_for('workouts'))
+        return redirect(url_for('workouts.workouts'))
     return render_template('edit_workout.html', workout=workout)
 
-@app.route('/delete_workout/<int:workout_id>', methods=['POST'])
+@workouts_bp.route('/delete_workout/<int:workout_id>', methods=['POST'])
 def delete_workout(workout_id):
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     delete_user_item(Workout, workout_id, user_id, 'Workout')
-    return redirect(url_for('workouts'))
+    return redirect(url_for('workouts.workouts'))
 
-@app.route('/remove_workout_template/<int:template_id>', methods=['POST'])
+@workouts_bp.route('/remove_workout_template/<int:template_id>', methods=['POST'])
 def remove_workout_template(template_id):
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     delete_user_item(WorkoutTemplate, template_id, user_id, 'Exercise')
-    return redirect(url_for('workouts'))
+    return redirect(url_for('workouts.workouts'))
 
-@app.route('/bulk_delete_workouts', methods=['POST'])
+@workouts_bp.route('/bulk_delete_workouts', methods=['POST'])
 def bulk_delete_workouts():
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     count = bulk_delete_items(Workout, request.form.getlist('workout_ids'), user_id, 'workouts')
     flash(f'Deleted {count} workout(s)')
-    return redirect(url_for('workouts'))
+    return redirect(url_for('workouts.workouts'))
 
-@app.route('/bulk_delete_notifications', methods=['POST'])
+@notifications_bp.route('/bulk_delete_notifications', methods=['POST'])
 def bulk_delete_notifications():
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     count = bulk_delete_items(Notification, request.form.getlist('notification_ids'), user_id, 'notifications')
     flash(f'Deleted {count} notification(s)')
-    return redirect(url_for('notifications'))
+    return redirect(url_for('notifications.notifications'))
 
-@app.route('/logout')
+@auth_bp.route('/logout')
 def logout():
     session.clear()
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
 
-@app.route('/settings', methods=['GET', 'POST'])
+@auth_bp.route('/settings', methods=['GET', 'POST'])
 def settings():
     user_id = get_user_id()
     if not user_id:
         flash('please log in to view your settings')
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
 
     user = User.query.get_or_404(session['user_id'])
 
@@ -965,7 +1699,7 @@ def settings():
             if new_username and new_username != user.username:
                 if User.query.filter(User.username == new_username).first():
                     flash('Username already taken')
-                    return redirect(url_for('settings'))
+                    return redirect(url_for('auth.settings'))
                 user.username = new_username
 
             current_password = request.form.get('current_password', '')
@@ -974,15 +1708,15 @@ def settings():
             if new_password:
                 if not current_password or not check_password_hash(user.password, current_password):
                     flash('Current password is incorrect')
-                    return redirect(url_for('settings'))
+                    return redirect(url_for('auth.settings'))
                 if new_password != confirm_password:
                     flash('New passwords do not match')
-                    return redirect(url_for('settings'))
+                    return redirect(url_for('auth.settings'))
                 user.password = generate_password_hash(new_password)
 
             db.session.commit()
             flash('Personal information updated')
-            return redirect(url_for('settings'))
+            return redirect(url_for('auth.settings'))
 
         if action == 'update_notifications':
             user.workout_reminder = bool(request.form.get('workout_reminder'))
@@ -993,133 +1727,98 @@ def settings():
             user.progress_summary_frequency = freq
             db.session.commit()
             flash('Notification settings saved')
-            return redirect(url_for('settings'))
+            return redirect(url_for('auth.settings'))
 
         if action == 'clear_data':
-            Meal.query.filter_by(user_id=user.id).delete()
-            Workout.query.filter_by(user_id=user.id).delete()
-            BodyMeasurement.query.filter_by(user_id=user.id).delete()
-            Notification.query.filter_by(user_id=user.id).delete()
-            MealTemplate.query.filter_by(user_id=user.id).delete()
-            WorkoutTemplate.query.filter_by(user_id=user.id).delete()
-            db.session.commit()
-            flash('All logs cleared')
-            return redirect(url_for('settings'))
+            session['purge_job_id'] = purge_jobs.submit(user.id)
+            flash('Clearing all logs in the background')
+            return redirect(url_for('auth.settings'))
 
         if action == 'delete_account':
-            Meal.query.filter_by(user_id=user.id).delete()
-            Workout.query.filter_by(user_id=user.id).delete()
-            BodyMeasurement.query.filter_by(user_id=user.id).delete()
-            Notification.query.filter_by(user_id=user.id).delete()
-            MealTemplate.query.filter_by(user_id=user.id).delete()
-            WorkoutTemplate.query.filter_by(user_id=user.id).delete()
-            db.session.delete(user)
+            #disabled in the request transaction so every worker refuses the login, even if the purge is cut short
+            user.deleted_at = datetime.utcnow()
             db.session.commit()
+            purge_jobs.submit(user.id, delete_user=True)
             session.clear()
-            flash('Your account and all data have been deleted')
-            return redirect(url_for('index'))
-
-    return render_template('settings.html', user=user)
-
-@app.route('/analytics')
-def analytics():
-    if 'user_id' not in session:
-        flash('please log in to view your analytics')
-        return redirect(url_for('login'))
-    
-    user_id = session['user_id']
-    user_profile = UserProfile.query.filter_by(user_id=user_id).first()
-    body_measurements = BodyMeasurement.query.filter_by(user_id=user_id).order_by(BodyMeasurement.date.desc(), BodyMeasurement.id.desc()).all()
-    
-    period_days = 30
-    period_start = date.today() - timedelta(days=period_days - 1)
-    recent_workouts = Workout.query.filter(
-        Workout.user_id == user_id,
-        Workout.date >= period_start
-    ).order_by(Workout.date.asc()).all()
-
-    recent_meals = Meal.query.filter(
-        Meal.user_id == user_id,
-        Meal.date >= period_start
-    ).order_by(Meal.date.asc()).all()
-    
-    week_ago = date.today() - timedelta(days=6)
-    weekly_workouts = Workout.query.filter(
-        Workout.user_id == user_id,
-        Workout.date >= week_ago
-    ).all()
-    weekly_meals = Meal.query.filter(
-        Meal.user_id == user_id,
-        Meal.date >= week_ago
-    ).all()
-    
-    weekly_calories_burned = sum(w.calories_burned for w in weekly_workouts)
-    weekly_calories_consumed = sum(m.calories for m in weekly_meals)
-    current_week_metrics = compute_period_metrics(user_id, end_date=date.today())
-    previous_week_metrics = compute_period_metrics(user_id, end_date=(date.today() - timedelta(days=7)))
-    weekly_workout_volume = current_week_metrics['workout_volume']
-    prev_week_volume = previous_week_metrics['workout_volume']
-    if prev_week_volume == 0:
-        if weekly_workout_volume > 0:
-            volume_trend = 'increased'
-        else:
-            volume_trend = 'unchanged'
-    else:
-        percent_change = (weekly_workout_volume - prev_week_volume) / prev_week_volume * 100
-        if percent_change > 5:
-            volume_trend = 'increased'
-        elif percent_change < -5:
-            volume_trend = 'decreased'
-        else:
-            volume_trend = 'unchanged'
-    protein_calories = current_week_metrics['protein'] * 4
-    carbohydrate_calories = current_week_metrics['carbs'] * 4
-    fat_calories = current_week_metrics['fats'] * 9
+            flash('Your account and all data are being deleted')
+            return redirect(url_for('main.index'))
+
+    purge_job = purge_jobs.status(session.get('purge_job_id'))
+    if purge_job is None or purge_job['state'] in ('done', 'failed'):
+        session.pop('purge_job_id', None)
+    return render_template('settings.html', user=user, purge_job=purge_job)
+
+def _volume_trend(current_volume, previous_volume):
+    if previous_volume == 0:
+        return 'increased' if current_volume > 0 else 'unchanged'
+    percent_change = (current_volume - previous_volume) / previous_volume * 100
+    if percent_change > 5:
+        return 'increased'
+    if percent_change < -5:
+        return 'decreased'
+    return 'unchanged'
+
+def _macro_percentages(protein, carbs, fats):
+    protein_calories = protein * 4
+    carbohydrate_calories = carbs * 4
+    fat_calories = fats * 9
     total_macro_calories = protein_calories + carbohydrate_calories + fat_calories
     if total_macro_calories > 0:
-        weekly_prot_pct = round((protein_calories / total_macro_calories) * 100, 1)
-        weekly_carb_pct = round((carbohydrate_calories / total_macro_calories) * 100, 1)
-        weekly_fat_pct = round((fat_calories / total_macro_calories) * 100, 1)
-    else:
-        weekly_prot_pct = weekly_carb_pct = weekly_fat_pct = 0
-    
-    month_ago = date.today() - timedelta(days=29)
-    monthly_workouts = Workout.query.filter(
-        Workout.user_id == user_id,
-        Workout.date >= month_ago
-    ).all()
-    monthly_meals = Meal.query.filter(
-        Meal.user_id == user_id,
-        Meal.date >= month_ago
-    ).all()
-    
-    monthly_calories_burned = sum(w.calories_burned for w in monthly_workouts)
-    monthly_calories_consumed = sum(m.calories for m in monthly_meals)
-    
-#Logging consistency
-    today = date.today()
+        return (round((protein_calories / total_macro_calories) * 100, 1),
+                round((carbohydrate_calories / total_macro_calories) * 100, 1),
+                round((fat_calories / total_macro_calories) * 100, 1))
+    return 0, 0, 0
+
+def compute_analytics_metrics(user_id, today=None):
+    #every analytics window is folded from a single scan of the user's daily rollups
+    if today is None:
+        today = date.today()
+    period_days = 30
+    calories_period_days = 7
+    period_start = today - timedelta(days=period_days - 1)
+    week_start = today - timedelta(days=6)
+    prev_week_end = today - timedelta(days=7)
+    prev_week_start = prev_week_end - timedelta(days=6)
     month_start = today.replace(day=1)
-    month_period_days = today.day
-
-    meal_dates = {r[0] for r in db.session.query(Meal.date).filter(Meal.user_id == user_id, Meal.date >= month_start, Meal.date <= today).all()}
-    workout_dates = {r[0] for r in db.session.query(Workout.date).filter(Workout.user_id == user_id, Workout.date >= month_start, Workout.date <= today).all()}
-    month_logged_dates = meal_dates | workout_dates
-    monthly_days_logged = len(month_logged_dates)
-    monthly_logged_pct = round((monthly_days_logged / month_period_days) * 100.0, 1) if month_period_days > 0 else 0.0
-
     prev_month_end = month_start - timedelta(days=1)
     prev_month_start = prev_month_end.replace(day=1)
+    calories_start = today - timedelta(days=calories_period_days - 1)
+
+    window_start = min(period_start, prev_week_start, prev_month_start)
+    with analytics_session() as read_session:
+        rollups = read_session.scalars(select(DailyRollup).filter(DailyRollup.user_id == user_id,
+                                                                  DailyRollup.date >= window_start,
+                                                                  DailyRollup.date <= today)).all()
+
+    def window(start, end):
+        return [r for r in rollups if start <= r.date <= end]
+
+    def total(rows, field):
+        return sum(getattr(r, field) or 0 for r in rows)
+
+    week = window(week_start, today)
+    prev_week = window(prev_week_start, prev_week_end)
+    month = window(period_start, today)
+
+    weekly_workout_volume = total(week, 'workout_volume')
+    prev_week_volume = total(prev_week, 'workout_volume')
+    weekly_prot_pct, weekly_carb_pct, weekly_fat_pct = _macro_percentages(
+        total(week, 'protein'), total(week, 'carbs'), total(week, 'fats'))
+
+    #Logging consistency
+    def days_logged(start, end):
+        return sum(1 for r in window(start, end) if r.meal_count or r.workout_count)
+
+    month_period_days = today.day
+    monthly_days_logged = days_logged(month_start, today)
+    monthly_logged_pct = round((monthly_days_logged / month_period_days) * 100.0, 1) if month_period_days > 0 else 0.0
     prev_month_period_days = prev_month_end.day
-    prev_meal_dates = {r[0] for r in db.session.query(Meal.date).filter(Meal.user_id == user_id, Meal.date >= prev_month_start, Meal.date <= prev_month_end).all()}
-    prev_workout_dates = {r[0] for r in db.session.query(Workout.date).filter(Workout.user_id == user_id, Workout.date >= prev_month_start, Workout.date <= prev_month_end).all()}
-    prev_logged_dates = prev_meal_dates | prev_workout_dates
-    prev_month_days_logged = len(prev_logged_dates)
+    prev_month_days_logged = days_logged(prev_month_start, prev_month_end)
     previous_month_logged_pct = round((prev_month_days_logged / prev_month_period_days) * 100.0, 1) if prev_month_period_days > 0 else 0.0
 
     consistency_drop_pct = round(previous_month_logged_pct - monthly_logged_pct, 1)
     CONSISTENCY_DROP_THRESHOLD = 1.0  # percent points
     consistency_alert = False
-    consistency_trend = 'unchanged'
     if consistency_drop_pct >= CONSISTENCY_DROP_THRESHOLD:
         consistency_trend = 'decreased'
         consistency_alert = True
@@ -1128,91 +1827,127 @@ def analytics():
     else:
         consistency_trend = 'unchanged'
 
-    calories_period_days = 7
-    calories_start = date.today() - timedelta(days=calories_period_days - 1)
-    calories_by_date = defaultdict(lambda: {'consumed': 0, 'burned': 0, 'net': 0})
-
-    for i in range(calories_period_days):
-        d = (calories_start + timedelta(days=i)).isoformat()
-        calories_by_date[d] = {'consumed': 0, 'burned': 0, 'net': 0}
-
-    for meal in recent_meals:
-        if meal.date >= calories_start:
-            date_str = meal.date.isoformat()
-            calories_by_date[date_str]['consumed'] += meal.calories
-
-    for workout in recent_workouts:
-        if workout.date >= calories_start:
-            date_str = workout.date.isoformat()
-            calories_by_date[date_str]['burned'] += workout.calories_burned
-
-    sorted_dates = sorted(calories_by_date.keys())
-    for date_str in sorted_dates:
-        calories_by_date[date_str]['net'] = calories_by_date[date_str]['consumed'] - calories_by_date[date_str]['burned']
-
+    by_date = {r.date: r for r in month}
+    calories_dates = [calories_start + timedelta(days=i) for i in range(calories_period_days)]
+    consumed = [by_date[d].calories_consumed if d in by_date else 0 for d in calories_dates]
+    burned = [by_date[d].calories_burned if d in by_date else 0 for d in calories_dates]
     calories_chart_data = {
-        'dates': sorted_dates,
-        'consumed': [calories_by_date[d]['consumed'] for d in sorted_dates],
-        'burned': [calories_by_date[d]['burned'] for d in sorted_dates],
-        'net': [calories_by_date[d]['net'] for d in sorted_dates]
+        'dates': [d.isoformat() for d in calories_dates],
+        'consumed': consumed,
+        'burned': burned,
+        'net': [c - b for c, b in zip(consumed, burned)]
     }
 
-
-    volume_by_date = defaultdict(float)
-    day_count = period_days
-    for i in range(day_count):
-        d = (period_start + timedelta(days=i)).isoformat()
-        volume_by_date[d] = 0.0
-
-    for workout in recent_workouts: #Accumulate workout volume per day
-        date_str = workout.date.isoformat()
-        volume_by_date[date_str] += (workout.sets or 0) * (workout.reps or 0) * (workout.weight or 0)
-
-    sorted_volume_dates = sorted(volume_by_date.keys())
+    volume_dates = [period_start + timedelta(days=i) for i in range(period_days)]
     workout_volume_chart_data = {
-        'dates': sorted_volume_dates,
-        'volumes': [volume_by_date[d] for d in sorted_volume_dates]
+        'dates': [d.isoformat() for d in volume_dates],
+        'volumes': [float(by_date[d].workout_volume or 0) if d in by_date else 0.0 for d in volume_dates]
     }
-
     workout_total_volume = sum(workout_volume_chart_data['volumes'])
-    workout_avg_volume = (workout_total_volume / len(workout_volume_chart_data['volumes'])) if workout_volume_chart_data['volumes'] else 0
-    
-    today = date.today()
-    today_meals = Meal.query.filter_by(user_id=user_id, date=today).all()
+    workout_avg_volume = workout_total_volume / period_days
+
+    today_rollup = by_date.get(today)
     daily_macros = {
-        'protein': sum(m.protein for m in today_meals),
-        'carbs': sum(m.carbs for m in today_meals),
-        'fats': sum(m.fats for m in today_meals),
-        'calories': sum(m.calories for m in today_meals)
+        'protein': today_rollup.protein if today_rollup else 0,
+        'carbs': today_rollup.carbs if today_rollup else 0,
+        'fats': today_rollup.fats if today_rollup else 0,
+        'calories': today_rollup.calories_consumed if today_rollup else 0
     }
-    
-    bm = BodyMeasurement.query.filter_by(user_id=user_id).order_by(BodyMeasurement.date.desc(), BodyMeasurement.id.desc()).first()
+
+    return {
+        'weekly_calories_burned': total(week, 'calories_burned'),
+        'weekly_calories_consumed': total(week, 'calories_consumed'),
+        'monthly_calories_burned': total(month, 'calories_burned'),
+        'monthly_calories_consumed': total(month, 'calories_consumed'),
+        'weekly_workout_volume': weekly_workout_volume,
+        'prev_week_volume': prev_week_volume,
+        'volume_trend': _volume_trend(weekly_workout_volume, prev_week_volume),
+        'weekly_prot_pct': weekly_prot_pct,
+        'weekly_carb_pct': weekly_carb_pct,
+        'weekly_fat_pct': weekly_fat_pct,
+        'calories_chart_data': calories_chart_data,
+        'workout_volume_chart_data': workout_volume_chart_data,
+        'workout_total_volume': workout_total_volume,
+        'workout_avg_volume': round(workout_avg_volume, 1),
+        'daily_macros': daily_macros,
+        'monthly_days_logged': monthly_days_logged,
+        'month_period_days': month_period_days,
+        'monthly_logged_pct': monthly_logged_pct,
+        'previous_month_logged_pct': previous_month_logged_pct,
+        'consistency_drop_pct': consistency_drop_pct,
+        'consistency_alert': consistency_alert,
+        'consistency_trend': consistency_trend
+    }
+
+def macro_targets(bm, daily_macros):
     if bm and bm.weight:
         protein_target_grams = round(bm.weight * 1.2, 1)
-    else:
-        protein_target_grams = 50.0
-    protein_today_grams = daily_macros['protein']
-    try:
-        protein_target_pct = min(100.0, round((protein_today_grams / protein_target_grams) * 100.0, 1)) if protein_target_grams > 0 else 0.0
-    except Exception:
-        protein_target_pct = 0.0
-    
-    if bm and bm.weight:
         carb_target_grams = round(bm.weight * 5.0, 1)
         fat_target_grams = round(bm.weight * 1.0, 1)
     else:
+        protein_target_grams = 50.0
         carb_target_grams = 250.0
         fat_target_grams = 50.0
-    carb_today_grams = daily_macros['carbs']
-    fat_today_grams = daily_macros['fats']
-    try:
-        carb_target_pct = min(100.0, round((carb_today_grams / carb_target_grams) * 100.0, 1)) if carb_target_grams > 0 else 0.0
-    except Exception:
-        carb_target_pct = 0.0
-    try:
-        fat_target_pct = min(100.0, round((fat_today_grams / fat_target_grams) * 100.0, 1)) if fat_target_grams > 0 else 0.0
-    except Exception:
-        fat_target_pct = 0.0
+
+    def target_pct(today_grams, target_grams):
+        try:
+            return min(100.0, round((today_grams / target_grams) * 100.0, 1)) if target_grams > 0 else 0.0
+        except Exception:
+            return 0.0
+
+    return {
+        'protein_target_grams': protein_target_grams,
+        'protein_today_grams': daily_macros['protein'],
+        'protein_target_pct': target_pct(daily_macros['protein'], protein_target_grams),
+        'carb_target_grams': carb_target_grams,
+        'carb_today_grams': daily_macros['carbs'],
+        'carb_target_pct': target_pct(daily_macros['carbs'], carb_target_grams),
+        'fat_target_grams': fat_target_grams,
+        'fat_today_grams': daily_macros['fats'],
+        'fat_target_pct': target_pct(daily_macros['fats'], fat_target_grams)
+    }
+
+def compute_dashboard_metrics(user_id, today=None):
+    if today is None:
+        today = date.today()
+    week_ago = today - timedelta(days=6)
+    rollups = DailyRollup.query.filter(DailyRollup.user_id == user_id, DailyRollup.date >= week_ago, DailyRollup.date <= today).all()
+    today_rollup = next((r for r in rollups if r.date == today), None)
+    bm = BodyMeasurement.query.filter_by(user_id=user_id).order_by(BodyMeasurement.date.desc(), BodyMeasurement.id.desc()).first()
+
+    daily_macros = {
+        'protein': today_rollup.protein if today_rollup else 0,
+        'carbs': today_rollup.carbs if today_rollup else 0,
+        'fats': today_rollup.fats if today_rollup else 0,
+    }
+    return {
+        'total_cal': today_rollup.calories_consumed if today_rollup else 0,
+        'meals_count': today_rollup.meal_count if today_rollup else 0,
+        'workout_cal': today_rollup.calories_burned if today_rollup else 0,
+        'workouts_count': today_rollup.workout_count if today_rollup else 0,
+        'weekly_cal': sum(r.calories_consumed or 0 for r in rollups),
+        'weekly_workout_cal': sum(r.calories_burned or 0 for r in rollups),
+        'daily_macros': daily_macros,
+        **macro_targets(bm, daily_macros)
+    }
+
+def get_dashboard_snapshot(user_id):
+    #snapshots are dropped by invalidate_user_cache whenever the user's meals, workouts or measurements change
+    today = date.today()
+    return cached_user_metrics(user_id, f'dashboard:{today}', lambda: compute_dashboard_metrics(user_id, today))
+
+@analytics_bp.route('/analytics')
+def analytics():
+    if 'user_id' not in session:
+        flash('please log in to view your analytics')
+        return redirect(url_for('auth.login'))
+    
+    user_id = session['user_id']
+    user_profile = UserProfile.query.filter_by(user_id=user_id).first()
+    body_measurements = BodyMeasurement.query.filter_by(user_id=user_id).order_by(BodyMeasurement.date.desc(), BodyMeasurement.id.desc()).all()
+    today = date.today()
+    metrics = cached_user_metrics(user_id, f'analytics:{today}', lambda: compute_analytics_metrics(user_id, today))
+    bm = body_measurements[0] if body_measurements else None
     
     weight_chart_data = {
         'dates': [m.date.isoformat() for m in body_measurements if m.weight],
@@ -1225,40 +1960,9 @@ def analytics():
     return render_template('analytics.html',
                          user_profile=user_profile,
                          body_measurements=body_measurements,
-                         recent_workouts=recent_workouts,
-                         recent_meals=recent_meals,
-                         weekly_calories_burned=weekly_calories_burned,
-                         weekly_calories_consumed=weekly_calories_consumed,
-                         monthly_calories_burned=monthly_calories_burned,
-                         monthly_calories_consumed=monthly_calories_consumed,
-                                 weekly_workout_volume=weekly_workout_volume,
-                                 prev_week_volume=prev_week_volume,
-                                 volume_trend=volume_trend,
-                                 weekly_prot_pct=weekly_prot_pct,
-                                 weekly_carb_pct=weekly_carb_pct,
-                                 weekly_fat_pct=weekly_fat_pct,
-                         calories_chart_data=calories_chart_data,
-                         workout_volume_chart_data=workout_volume_chart_data,
-                         workout_total_volume=workout_total_volume,
-                         workout_avg_volume=round(workout_avg_volume, 1),
-                         daily_macros=daily_macros,
-                         protein_target_grams=protein_target_grams,
-                         protein_today_grams=protein_today_grams,
-                         protein_target_pct=protein_target_pct,
-                         carb_target_grams=carb_target_grams,
-                         carb_today_grams=carb_today_grams,
-                         carb_target_pct=carb_target_pct,
-                         fat_target_grams=fat_target_grams,
-                         fat_today_grams=fat_today_grams,
-                         fat_target_pct=fat_target_pct,
-                         monthly_days_logged=monthly_days_logged,
-                         month_period_days=month_period_days,
-                         monthly_logged_pct=monthly_logged_pct,
-                         previous_month_logged_pct=previous_month_logged_pct,
-                         consistency_drop_pct=consistency_drop_pct,
-                         consistency_alert=consistency_alert,
-                         consistency_trend=consistency_trend,
-                         weight_chart_data=weight_chart_data)
+                         weight_chart_data=weight_chart_data,
+                         **metrics,
+                         **macro_targets(bm, metrics['daily_macros']))
 
 def get_measurement_data(form):
     return {
@@ -1274,49 +1978,49 @@ def get_measurement_data(form):
         'notes': form.get('notes', '')
     }
 
-@app.route('/body_measurement', methods=['GET', 'POST'])
+@main_bp.route('/body_measurement', methods=['GET', 'POST'])
 def add_body_measurement():
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     if request.method == 'POST':
         data = get_measurement_data(request.form)
         measurement = BodyMeasurement(user_id=user_id, **data)
         db.session.add(measurement)
         db.session.commit()
         flash('Body measurement added.')
-        return redirect(url_for('analytics'))
+        return redirect(url_for('analytics.analytics'))
     return render_template('add_body_measurement.html', today_date=date.today().isoformat())
 
-@app.route('/body_measurement/<int:measurement_id>/edit', methods=['GET', 'POST'])
+@main_bp.route('/body_measurement/<int:measurement_id>/edit', methods=['GET', 'POST'])
 def edit_body_measurement(measurement_id):
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     measurement = BodyMeasurement.query.get_or_404(measurement_id)
     if measurement.user_id != user_id:
         flash('Invalid measurement')
-        return redirect(url_for('analytics'))
+        return redirect(url_for('analytics.analytics'))
     if request.method == 'POST':
         for k, v in get_measurement_data(request.form).items():
             setattr(measurement, k, v)
         db.session.commit()
         flash('Body measurement updated.')
-        return redirect(url_for('analytics'))
+        return redirect(url_for('analytics.analytics'))
     return render_template('edit_body_measurement.html', measurement=measurement)
 
-@app.route('/body_measurement/<int:measurement_id>/delete', methods=['POST'])
+@main_bp.route('/body_measurement/<int:measurement_id>/delete', methods=['POST'])
 def delete_body_measurement(measurement_id):
     user_id = get_user_id()
     if not user_id:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     delete_user_item(BodyMeasurement, measurement_id, user_id, 'Measurement')
-    return redirect(url_for('analytics'))
+    return redirect(url_for('analytics.analytics'))
 
-@app.route('/user_profile', methods=['GET', 'POST'])
+@auth_bp.route('/user_profile', methods=['GET', 'POST'])
 def user_profile():
     if 'user_id' not in session:
-        return redirect(url_for('login'))
+        return redirect(url_for('auth.login'))
     
     user_id = session['user_id']
     user_profile = UserProfile.query.filter_by(user_id=user_id).first()
@@ -1338,37 +2042,390 @@ def user_profile():
             db.session.add(user_profile)
         db.session.commit()
         flash('Profile updated successfully')
-        return redirect(url_for('analytics'))
+        return redirect(url_for('analytics.analytics'))
     
     return render_template('user_profile.html', user_profile=user_profile)
 
-@app.route('/notifications')
+@notifications_bp.route('/notifications')
 def notifications():
     user_id = get_user_id()
     if not user_id:
         flash('please log in to view your notifications')
-        return redirect(url_for('login'))
-    notes = Notification.query.filter_by(user_id=session['user_id']).order_by(Notification.created_at.desc()).all()
-    unread = [n for n in notes if not n.is_read]
-    for n in unread:
-        n.is_read = True
-    if unread:
+        return redirect(url_for('auth.login'))
+    if Notification.query.filter_by(user_id=user_id, is_read=False).update({'is_read': True}):
+        mark_notifications_dirty([user_id])
         db.session.commit()
-    for n in notes:
-        n.local_created_at = utc_to_local(n.created_at)
-    return render_template('notifications.html', notifications=notes)
+    notes, next_cursor = notifications_page(user_id)
+    return render_template('notifications.html', notifications=notes, next_cursor=next_cursor)
+
+def render_page_json(template, items_name, items, next_cursor):
+    return {'html': render_template(template, **{items_name: items}), 'next_cursor': next_cursor}
+
+@meals_bp.route('/api/meals/page')
+def api_meals_page():
+    if 'user_id' not in session:
+        return '', 401
+    items, next_cursor = meals_page(session['user_id'], request.args.get('cursor'))
+    return render_page_json('meal_items.html', 'meals', items, next_cursor)
 
-@app.route('/api/notifications')
+@workouts_bp.route('/api/workouts/page')
+def api_workouts_page():
+    if 'user_id' not in session:
+        return '', 401
+    items, next_cursor = workouts_page(session['user_id'], request.args.get('cursor'))
+    return render_page_json('workout_items.html', 'workouts', items, next_cursor)
+
+@notifications_bp.route('/api/notifications/page')
+def api_notifications_page():
+    if 'user_id' not in session:
+        return '', 401
+    items, next_cursor = notifications_page(session['user_id'], request.args.get('cursor'))
+    return render_page_json('notification_items.html', 'notifications', items, next_cursor)
+
+@main_bp.route('/api/cache/stats')
+def api_cache_stats():
+    #per worker counters for monitoring: with CACHE_STATS_TOKEN set they need 'Authorization: Bearer <token>',
+    #without it the route only exists in debug mode, for logged in users
+    token = current_app.config['CACHE_STATS_TOKEN']
+    if token:
+        if not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return {'error': 'invalid token'}, 401
+    elif not current_app.debug:
+        abort(404)
+    elif 'user_id' not in session:
+        return {'error': 'login required'}, 401
+    return metrics_cache.info()
+
+@notifications_bp.route('/api/notifications')
 def api_notifications():
     if 'user_id' not in session:
         return {'notifications': []}
-    notes = Notification.query.filter_by(user_id=session['user_id'], is_read=False).order_by(Notification.created_at.desc()).all()
-    return {'notifications': [
-        {'id': n.id, 'message': n.message, 'created_at': utc_to_local(n.created_at).strftime('%Y-%m-%d %H:%M'), 'is_read': n.is_read}
-        for n in notes
-    ]}
+    user_id = session['user_id']
+    since_id = request.args.get('since_id', type=int)
+    #not from the metrics cache: another worker's write would leave a per-process copy stale and answer 304 wrongly
+    state = query_notification_state(user_id)
+    etag = f"{state['latest_id']}-{state['unread']}-{since_id or 0}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        notes = unread_notifications_since(user_id, since_id)
+        response = jsonify({'notifications': [serialize_notification(n) for n in notes]})
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def _since_id():
+    #on reconnect EventSource repeats the since_id of the first request, Last-Event-ID is the up to date one
+    since_id = request.headers.get('Last-Event-ID', type=int)
+    if since_id is None:
+        since_id = request.args.get('since_id', type=int)
+    return since_id
+
+@notifications_bp.route('/api/notifications/stream')
+@exempt_from_request_budget
+def notifications_stream():
+    if 'user_id' not in session:
+        return '', 401
+    user_id = session['user_id']
+    since_id = _since_id()
+    #the generator outlives the request context, so it holds the broker itself rather than the proxy
+    broker = notification_broker._get_current_object()
+    #subscribe before reading the backlog so nothing created in between is missed
+    subscription = broker.subscribe(user_id)
+    if subscription is None:
+        #EventSource gives up on an error status instead of reconnecting, so the client switches to long-polling
+        return {'error': 'too many open notification streams'}, 503, {'Retry-After': '30'}
+    try:
+        backlog = [serialize_notification(n) for n in reversed(unread_notifications_since(user_id, since_id))] if since_id is not None else []
+        db.session.remove()
+    except Exception:
+        broker.unsubscribe(user_id, subscription)
+        raise
+    deadline = time.monotonic() + current_app.config['NOTIFICATION_STREAM_TIMEOUT']
+    heartbeat = current_app.config['NOTIFICATION_STREAM_HEARTBEAT']
+
+    def event(payload):
+        return f"id: {payload['id']}\nevent: notification\ndata: {json.dumps(payload)}\n\n"
+
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            for payload in backlog:
+                yield event(payload)
+            while time.monotonic() < deadline:
+                try:
+                    payload = subscription.get(timeout=min(heartbeat, max(deadline - time.monotonic(), 0.1)))
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield event(payload)
+        finally:
+            broker.unsubscribe(user_id, subscription)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@notifications_bp.route('/api/notifications/poll')
+@exempt_from_request_budget
+def notifications_long_poll():
+    #error statuses rather than an empty list when nothing can be waited for, so clients back off instead of re-polling at once
+    if 'user_id' not in session:
+        return {'error': 'login required'}, 401
+    user_id = session['user_id']
+    since_id = _since_id()
+    subscription = notification_broker.subscribe(user_id)
+    try:
+        notes = [serialize_notification(n) for n in reversed(unread_notifications_since(user_id, since_id))]
+        db.session.remove()
+        if not notes:
+            #over the stream cap there is nothing to wait on
+            if subscription is None:
+                return {'error': 'too many open notification streams'}, 503, {'Retry-After': '30'}
+            try:
+                notes = [subscription.get(timeout=current_app.config['NOTIFICATION_LONG_POLL_TIMEOUT'])]
+            except queue.Empty:
+                pass
+    finally:
+        if subscription is not None:
+            notification_broker.unsubscribe(user_id, subscription)
+    return {'notifications': notes}
+
+EXPORT_DATASETS = {
+    'meals': (Meal, ('id', 'date', 'name', 'quantity', 'calories', 'protein', 'carbs', 'fats', 'is_favorite')),
+    'workouts': (Workout, ('id', 'date', 'name', 'exercise_type', 'muscle_groups', 'duration', 'sets', 'reps',
+                           'weight', 'volume', 'intensity', 'calories_burned', 'is_favorite')),
+    'measurements': (BodyMeasurement, ('id', 'date', 'weight', 'body_fat_percentage', 'chest', 'waist', 'hips',
+                                       'biceps', 'thighs', 'neck', 'notes')),
+    'notifications': (Notification, ('id', 'created_at', 'kind', 'period_key', 'message', 'is_read')),
+}
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+def export_rows(model, columns, user_id, chunk_size):
+    #yield_per keeps one chunk of rows in memory no matter how long the history is
+    query = db.session.query(*[getattr(model, c) for c in columns]).filter(model.user_id == user_id).order_by(model.id)
+    for row in query.yield_per(chunk_size):
+        yield [_export_value(v) for v in row]
+
+def export_csv_chunks(columns, rows, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for i, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if i % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def export_json_chunks(columns, rows, chunk_size):
+    parts = ['[']
+    for i, row in enumerate(rows):
+        parts.append(('\n' if i == 0 else ',\n') + json.dumps(dict(zip(columns, row))))
+        if len(parts) >= chunk_size:
+            yield ''.join(parts)
+            parts = []
+    parts.append('\n]\n')
+    yield ''.join(parts)
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+@main_bp.route('/export/<dataset>')
+@exempt_from_request_budget
+def export_data(dataset):
+    if 'user_id' not in session:
+        return redirect(url_for('auth.login'))
+    if dataset not in EXPORT_DATASETS:
+        abort(404)
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'json'):
+        abort(400)
+    model, columns = EXPORT_DATASETS[dataset]
+    chunk_size = current_app.config['EXPORT_CHUNK_SIZE']
+    rows = export_rows(model, columns, session['user_id'], chunk_size)
+    chunks = (export_csv_chunks if fmt == 'csv' else export_json_chunks)(columns, rows, chunk_size)
+    headers = {
+        'Content-Disposition': f'attachment; filename=fittrack-{dataset}.{fmt}',
+        'Cache-Control': 'private, no-store',
+        'Vary': 'Accept-Encoding'
+    }
+    if 'gzip' in request.accept_encodings:
+        headers['Content-Encoding'] = 'gzip'
+        chunks = gzip_chunks(chunks)
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/json'
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+def iter_csv_entries(stream):
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    for row in reader:
+        #blank cells count as missing so the form defaults apply
+        yield reader.line_num, {k.strip(): v.strip() for k, v in row.items() if k and v not in (None, '')}
+
+_JSON_SEPARATORS = re.compile(r'[\s,\[\]]*')
+
+def iter_json_entries(stream, read_size=65536, max_entry_size=1 << 20):
+    #accepts a top level array or one object per line without loading the whole file; entries are decoded in place
+    #at an offset and the buffer is only cut when more input is read
+    decoder = json.JSONDecoder()
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig')
+    buffer, pos, index, eof = '', 0, 0, False
+    while True:
+        pos = _JSON_SEPARATORS.match(buffer, pos).end()
+        if pos < len(buffer):
+            try:
+                entry, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                #only an error in the last few characters (a literal or number cut in half) or an open string can be
+                #fixed by reading on; anything else is malformed and stops the import right away
+                cut_off = e.pos > len(buffer) - 8 or e.msg.startswith('Unterminated string')
+                if eof or not cut_off or len(buffer) - pos > max_entry_size:
+                    raise ValueError(f'Malformed JSON after entry {index}')
+            else:
+                index += 1
+                yield index, entry
+                continue
+        elif eof:
+            return
+        chunk = text.read(read_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+def import_format(filename, content_type, requested=None):
+    if requested in ('csv', 'json'):
+        return requested
+    if filename:
+        ext = os.path.splitext(filename)[1].lower()
+        if ext in ('.json', '.jsonl', '.ndjson'):
+            return 'json'
+        if ext == '.csv':
+            return 'csv'
+    return 'json' if 'json' in (content_type or '') else 'csv'
+
+def import_entries(user_id, dataset, stream, fmt):
+    chunk_size = current_app.config['IMPORT_CHUNK_SIZE']
+    model = Meal if dataset == 'meals' else Workout
+    entries = iter_csv_entries(stream) if fmt == 'csv' else iter_json_entries(stream)
+    templates, catalog_data, rows, chunk_templates, errors = {}, {}, [], [], []
+    result = {'imported': 0, 'failed': 0}
+
+    def record_error(row_number, message, count=1):
+        result['failed'] += count
+        if len(errors) < current_app.config['IMPORT_MAX_REPORTED_ERRORS']:
+            errors.append({'row': row_number, 'error': message})
+
+    def flush_rows():
+        db.session.bulk_insert_mappings(model, rows)
+        db.session.commit()
+        result['imported'] += len(rows)
+        rows.clear()
+        #only templates of committed rows are counted
+        for template in chunk_templates:
+            template['frequency'] = templates[template['name']]['frequency'] + 1 if template['name'] in templates else 1
+            templates[template['name']] = template
+        chunk_templates.clear()
+
+    def finish():
+        #templates and rollups are rebuilt once for the whole file instead of per row
+        if dataset == 'meals':
+            upsert_templates(MealTemplate, user_id, templates.values(), ('calories', 'protein', 'carbs', 'fats'))
+        else:
+            upsert_templates(WorkoutTemplate, user_id, templates.values())
+        db.session.commit()
+        if result['imported']:
+            rebuild_daily_rollups(user_id)
 
-@app.route('/api/notifications/read/<int:note_id>', methods=['POST'])
+    try:
+        try:
+            for row_number, entry in entries:
+                try:
+                    if not isinstance(entry, dict):
+                        raise ValueError('Invalid values')
+                    if dataset == 'meals':
+                        row, template = parse_meal_entry(entry)
+                    else:
+                        if not is_custom_entry(entry):
+                            name = str(entry.get('name') or '').strip().lower()
+                            if name and name not in catalog_data:
+                                catalog_data[name] = get_exercise_data(name)
+                        workout = parse_workout_entry(entry, catalog_data)
+                        try:
+                            day = datetime.strptime(entry['date'], '%Y-%m-%d').date() if entry.get('date') else date.today()
+                        except (TypeError, ValueError):
+                            raise ValueError('Invalid date')
+                        compute_session_calories([workout])
+                        row = {k: workout[k] for k in ('name', 'exercise_type', 'muscle_groups', 'duration', 'sets', 'reps',
+                                                       'weight', 'volume', 'intensity', 'calories_burned')}
+                        row['date'] = day
+                        template = {k: workout[k] for k in ('name', 'exercise_type', 'muscle_groups', 'is_custom')}
+                        template['calories_per_hour'] = workout.get('calories_per_hour', 0)
+                except ValueError as e:
+                    record_error(row_number, str(e))
+                    continue
+                row['user_id'] = user_id
+                rows.append(row)
+                chunk_templates.append(template)
+                if len(rows) >= chunk_size:
+                    flush_rows()
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            record_error(None, f'Stopped reading the file: {e}')
+        if rows:
+            flush_rows()
+    except Exception as e:
+        #e.g. database is locked past busy_timeout: the failed chunk is dropped, the chunks committed before it
+        #stay imported and still get their templates and rollups
+        db.session.rollback()
+        if isinstance(e, SQLAlchemyError):
+            record_error(None, f'Stopped importing: {getattr(e, "orig", None) or e}', count=len(rows))
+        try:
+            finish()
+        except SQLAlchemyError:
+            db.session.rollback()
+            record_error(None, 'Templates and daily totals were not updated; run flask backfill-rollups', count=0)
+        if not isinstance(e, SQLAlchemyError):
+            raise
+    else:
+        finish()
+    result['errors'] = errors
+    return result
+
+@main_bp.route('/import/<dataset>', methods=['POST'])
+def import_data(dataset):
+    if 'user_id' not in session:
+        return {'error': 'login required'}, 401
+    if dataset not in ('meals', 'workouts'):
+        abort(404)
+    #only a raw body (text/csv, application/json) is streamed; werkzeug spools a multipart upload to a temporary
+    #file before the import starts. Both are capped by MAX_CONTENT_LENGTH
+    upload = request.files.get('file')
+    if upload is not None:
+        fmt = import_format(upload.filename, upload.mimetype, request.args.get('format'))
+        stream = upload.stream
+    else:
+        fmt = import_format(None, request.mimetype, request.args.get('format'))
+        stream = request.stream
+    return import_entries(session['user_id'], dataset, stream, fmt)
+
+@main_bp.cli.command('import-data')
+@click.argument('dataset', type=click.Choice(['meals', 'workouts']))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user-id', type=int, required=True, help='Owner of the imported rows.')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'json']), default=None, help='Defaults to the file extension.')
+def import_data_command(dataset, path, user_id, fmt):
+    with open(path, 'rb') as file:
+        result = import_entries(user_id, dataset, file, import_format(path, None, fmt))
+    click.echo(f"Imported {result['imported']} {dataset}, {result['failed']} row(s) failed")
+    for error in result['errors']:
+        click.echo(f"  row {error['row']}: {error['error']}")
+
+@notifications_bp.route('/api/notifications/read/<int:note_id>', methods=['POST'])
 def mark_notification_read(note_id):
     if 'user_id' not in session:
         return '', 401
@@ -1379,10 +2436,14 @@ def mark_notification_read(note_id):
     db.session.commit()
     return '', 204
 
-def load_exercises_from_csv():
+EXERCISES_CSV = 'data/Top 50 Excerice for your body.csv'
+EXERCISES_ARTIFACT = 'data/exercises.catalog.json'
+EXERCISES_ARTIFACT_FORMAT = 1
+
+def load_exercises_from_csv(path=EXERCISES_CSV):
     exercises = {}
     try:
-        with open('data/Top 50 Excerice for your body.csv', 'r', encoding='utf-8') as file:
+        with open(path, 'r', encoding='utf-8') as file:
             reader = csv.DictReader(file)
             mapping = {
                 'quadriceps': 'quadriceps', 'hamstrings': 'hamstrings', 'glutes': 'glutes',
@@ -1403,7 +2464,9 @@ def load_exercises_from_csv():
                     'muscle_groups': muscle_groups,
                     'met_value': 6.0,
                     'calories_per_30_min': int(row.get('Burns Calories (per 30 min)', 0)),
-                    'benefit': benefit
+                    'benefit': benefit,
+                    'equipment': (row.get('Equipment Needed') or '').lower().strip(),
+                    'difficulty': (row.get('Difficulty Level') or '').lower().strip()
                 }
     except FileNotFoundError:
         print("CSV file not found, returning empty exercises dict")
@@ -1411,11 +2474,221 @@ def load_exercises_from_csv():
         print(f"Error loading CSV: {e}")
     return exercises
 
-EXERCISES_DATA = load_exercises_from_csv()
+def _file_checksum(path):
+    try:
+        with open(path, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except OSError:
+        return None
+
+def _exercises_checksum(exercises):
+    return hashlib.sha256(json.dumps(exercises, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+def compile_exercise_catalog(csv_path=EXERCISES_CSV, artifact_path=EXERCISES_ARTIFACT):
+    source_checksum = _file_checksum(csv_path)
+    exercises = load_exercises_from_csv(csv_path)
+    if source_checksum is None or not exercises:
+        return exercises
+    artifact = {
+        'format': EXERCISES_ARTIFACT_FORMAT,
+        'source_checksum': source_checksum,
+        'checksum': _exercises_checksum(exercises),
+        'exercises': exercises
+    }
+    tmp_path = f'{artifact_path}.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(artifact, file, separators=(',', ':'))
+        os.replace(tmp_path, artifact_path)
+    except OSError as e:
+        print(f"Error writing exercise catalog: {e}")
+    return exercises
+
+def read_exercise_artifact(csv_path=EXERCISES_CSV, artifact_path=EXERCISES_ARTIFACT):
+    #None means the artifact is missing, corrupt or older than the csv and has to be recompiled
+    try:
+        with open(artifact_path, 'r', encoding='utf-8') as file:
+            artifact = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if artifact.get('format') != EXERCISES_ARTIFACT_FORMAT:
+        return None
+    source_checksum = _file_checksum(csv_path)
+    if source_checksum is not None and artifact.get('source_checksum') != source_checksum:
+        return None
+    exercises = artifact.get('exercises')
+    if not isinstance(exercises, dict) or artifact.get('checksum') != _exercises_checksum(exercises):
+        return None
+    return exercises
+
+def build_exercise_listing(exercises_data):
+    listing = []
+    for name, data in exercises_data.items():
+        benefit = data.get('benefit', '')
+        short_benefit = benefit[:50] + '...' if len(benefit) > 50 else benefit
+
+        listing.append({
+            'name': name.title(),
+            'exercise_type': data['exercise_type'],
+            'muscle_groups': data['muscle_groups'],
+            'calories_per_hour': data['calories_per_30_min'] * 2,
+            'benefit': short_benefit
+        })
+    return tuple(listing)
+
+def _trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _normalize_term(term):
+    #'dumbbells' and 'dumbbell' should hit the same posting list
+    term = term.lower().strip()
+    return term[:-1] if term.endswith('s') and not term.endswith('ss') else term
+
+def _split_terms(value):
+    terms = set()
+    for part in value.replace(' or ', ',').replace(' and ', ',').split(','):
+        part = _normalize_term(part)
+        if part:
+            terms.add(part)
+    return terms
+
+class ExerciseCatalog:
+    #read-only search indexes over the exercise catalog: word prefixes, name trigrams, muscle groups and equipment
+    def __init__(self, exercises):
+        self.exercises = exercises
+        self.listing = build_exercise_listing(exercises)
+        self._words = sorted({(word, name) for name in exercises for word in {name, *re.sub(r'[-()]', ' ', name).split()}})
+        self._word_keys = [word for word, _ in self._words]
+        self._trigrams = defaultdict(set)
+        self._muscles = defaultdict(set)
+        self._equipment = defaultdict(set)
+        self._types = defaultdict(set)
+        for name, data in exercises.items():
+            for gram in _trigrams(name):
+                self._trigrams[gram].add(name)
+            for muscle in _split_terms(data.get('muscle_groups', '')):
+                self._muscles[muscle].add(name)
+            for equipment in _split_terms(data.get('equipment', '')):
+                self._equipment[equipment].add(name)
+            self._types[data['exercise_type']].add(name)
+
+    def get(self, name):
+        return self.exercises.get(name.lower().strip())
+
+    def muscle_groups(self):
+        return sorted(self._muscles)
+
+    def equipment(self):
+        return sorted(self._equipment)
+
+    def _prefix_matches(self, prefix):
+        matches = {}
+        i = bisect.bisect_left(self._word_keys, prefix)
+        while i < len(self._words) and self._word_keys[i].startswith(prefix):
+            word, name = self._words[i]
+            matches[name] = max(matches.get(name, 0), 2.0 if word == name else 1.5)
+            i += 1
+        return matches
+
+    def _fuzzy_matches(self, query, min_similarity):
+        query_grams = _trigrams(query)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for name in self._trigrams.get(gram, ()):
+                shared[name] += 1
+        matches = {}
+        for name, count in shared.items():
+            similarity = count / len(query_grams | _trigrams(name))
+            if similarity >= min_similarity:
+                matches[name] = similarity
+        return matches
+
+    def search(self, query='', muscle=None, equipment=None, exercise_type=None, limit=10, min_similarity=0.3):
+        query = query.lower().strip()
+        if query:
+            scores = self._fuzzy_matches(query, min_similarity)
+            for name, score in self._prefix_matches(query).items():
+                scores[name] = max(scores.get(name, 0), score)
+        else:
+            scores = dict.fromkeys(self.exercises, 0)
+        for index, value in ((self._muscles, muscle), (self._equipment, equipment), (self._types, exercise_type)):
+            if value:
+                allowed = index.get(_normalize_term(value), set())
+                scores = {name: score for name, score in scores.items() if name in allowed}
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [{
+            'name': name.title(),
+            'exercise_type': self.exercises[name]['exercise_type'],
+            'muscle_groups': self.exercises[name]['muscle_groups'],
+            'equipment': self.exercises[name].get('equipment', ''),
+            'calories_per_hour': self.exercises[name]['calories_per_30_min'] * 2,
+            'score': round(score, 3)
+        } for name, score in ranked]
+
+class ExerciseCatalogStore:
+    #loads the compiled catalog on first use and swaps in a new one when the source csv changes
+    def __init__(self, csv_path=EXERCISES_CSV, artifact_path=EXERCISES_ARTIFACT, check_interval=5):
+        self.csv_path = csv_path
+        self.artifact_path = artifact_path
+        self.check_interval = check_interval
+        self._catalog = None
+        self._source_mtime = None
+        self._checked_at = 0
+        self._lock = Lock()
+
+    def _current_source_mtime(self):
+        try:
+            return os.stat(self.csv_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        source_mtime = self._current_source_mtime()
+        exercises = read_exercise_artifact(self.csv_path, self.artifact_path)
+        if exercises is None:
+            exercises = compile_exercise_catalog(self.csv_path, self.artifact_path)
+        self._catalog = ExerciseCatalog(exercises)
+        self._source_mtime = source_mtime
+        self._checked_at = time.monotonic()
+
+    def current(self):
+        catalog = self._catalog
+        if catalog is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return catalog
+        with self._lock:
+            if self._catalog is None or self._current_source_mtime() != self._source_mtime:
+                self._load()
+            self._checked_at = time.monotonic()
+            return self._catalog
+
+    def reload(self):
+        with self._lock:
+            self._load()
+            return self._catalog
+
+exercise_catalog = ExerciseCatalogStore()
+
+@main_bp.cli.command('compile-exercises')
+def compile_exercises_command():
+    exercises = compile_exercise_catalog()
+    exercise_catalog.reload()
+    click.echo(f"Compiled {len(exercises)} exercises into {EXERCISES_ARTIFACT}")
+
+@workouts_bp.route('/api/exercises/search')
+def api_exercise_search():
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    return {'results': exercise_catalog.current().search(
+        request.args.get('q', ''),
+        muscle=request.args.get('muscle'),
+        equipment=request.args.get('equipment'),
+        exercise_type=request.args.get('type'),
+        limit=limit
+    )}
 
 def get_exercise_data(exercise_name):
     exercise_lower = exercise_name.lower().strip()
-    return EXERCISES_DATA.get(exercise_lower, {
+    return exercise_catalog.current().exercises.get(exercise_lower, {
         'exercise_type': 'strength',
         'muscle_groups': 'various',
         'met_value': 6.0,
@@ -1447,64 +2720,321 @@ def send_daily_reminders_for_user(user):
     today = date.today()
     if user.meal_reminder:
         meal_count = Meal.query.filter_by(user_id=user.id, date=today).count()
-        if meal_count == 0 and not _notification_exists_on_date(user.id, 'You have not logged any meals today'):
-            create_notification(user.id, 'You have not logged any meals today!')
+        if meal_count == 0 and not notification_exists(user.id, 'meal_reminder', today.isoformat()):
+            create_notification(user.id, 'You have not logged any meals today!', kind='meal_reminder', period_key=today.isoformat())
     if user.workout_reminder:
         workout_count = Workout.query.filter_by(user_id=user.id, date=today).count()
-        if workout_count == 0 and not _notification_exists_on_date(user.id, 'No workout logged today'):
-            create_notification(user.id, 'No workout logged today. Stay active!')
+        if workout_count == 0 and not notification_exists(user.id, 'workout_reminder', today.isoformat()):
+            create_notification(user.id, 'No workout logged today. Stay active!', kind='workout_reminder', period_key=today.isoformat())
+
+def summary_period(frequency, today):
+    if frequency == 'daily':
+        return 'Daily', today, today
+    if frequency == 'weekly':
+        days_since_sunday = (today.weekday() + 1) % 7  
+        if days_since_sunday == 0:
+            end = today - timedelta(days=1)
+        else:
+            end = today - timedelta(days=days_since_sunday)
+        return 'Weekly', end - timedelta(days=6), end
+    prev_end = today.replace(day=1) - timedelta(days=1)
+    return 'Monthly', prev_end.replace(day=1), prev_end
+
+def send_summaries_in_batches(frequency, batch_size=500, today=None, progress=None):
+    if today is None:
+        today = date.today()
+    summary_type, start, end = summary_period(frequency, today)
+    previous_start, previous_end = previous_period(start, end)
+    kind, period_key = summary_kind(summary_type), start.isoformat()
+    frequency_filter = User.progress_summary_frequency == frequency
+    if frequency == 'weekly':
+        frequency_filter = db.or_(frequency_filter, User.progress_summary_frequency.is_(None))
+
+    processed = created = 0
+    last_id = 0
+    while True:
+        user_ids = [row[0] for row in db.session.query(User.id).filter(User.id > last_id, frequency_filter, User.deleted_at.is_(None)).order_by(User.id).limit(batch_size).all()]
+        if not user_ids:
+            break
+        last_id = user_ids[-1]
+        already_sent = {row[0] for row in db.session.query(Notification.user_id).filter(
+            Notification.user_id.in_(user_ids), Notification.kind == kind, Notification.period_key == period_key)}
+        targets = [user_id for user_id in user_ids if user_id not in already_sent]
+        if targets:
+            current = compute_period_metrics_for_users(targets, start, end)
+            previous = compute_period_metrics_for_users(targets, previous_start, previous_end)
+            #a summary sent concurrently from the login path is skipped instead of failing the batch
+            db.session.execute(sqlite_insert(Notification).on_conflict_do_nothing(), [
+                {'user_id': user_id, 'kind': kind, 'period_key': period_key, 'is_read': False,
+                 'message': format_summary_message(summary_type, start, end, current[user_id], previous[user_id])}
+                for user_id in targets
+            ])
+            mark_notifications_dirty(targets)
+            db.session.commit()
+        processed += len(user_ids)
+        created += len(targets)
+        if progress:
+            progress(processed, created)
+    return processed, created
+
+@main_bp.cli.command('send-summaries')
+@click.option('--frequency', type=click.Choice(['daily', 'weekly', 'monthly', 'all']), default='all',
+              help='Only send summaries to users with this progress summary preference.')
+@click.option('--batch-size', type=int, default=500, show_default=True)
+def send_summaries_command(frequency, batch_size):
+    frequencies = ['daily', 'weekly', 'monthly'] if frequency == 'all' else [frequency]
+    for freq in frequencies:
+        processed, created = send_summaries_in_batches(
+            freq, batch_size,
+            progress=lambda processed, created: click.echo(f'{freq}: {processed} user(s) processed, {created} summaries created'))
+        click.echo(f'{freq}: done, {created} summaries created for {processed} user(s)')
 
 def send_daily_summary_for_user(user):
     today = date.today()
-    if not _notification_exists_on_date(user.id, 'Daily Summary'):
+    if not notification_exists(user.id, 'daily_summary', today.isoformat()):
         create_summary_for_user(user, today, today, summary_type='Daily')
 
 def send_weekly_summary_for_user(user):
     today = date.today()
-    week_ago = today - timedelta(days=7)
-    existing = Notification.query.filter(
-        Notification.user_id == user.id,
-        Notification.message.contains('Weekly Summary'),
-        db.func.date(Notification.created_at) >= week_ago
-    ).first()
-    if not existing:
-        days_since_sunday = (today.weekday() + 1) % 7  
-        if days_since_sunday == 0:
-            end = today - timedelta(days=1)
-        else:
-            end = today - timedelta(days=days_since_sunday)
-        start = end - timedelta(days=6)
+    _, start, end = summary_period('weekly', today)
+    if not notification_exists(user.id, 'weekly_summary', start.isoformat()):
         create_summary_for_user(user, start, end, summary_type='Weekly')
 
 def send_monthly_summary_for_user(user):
     today = date.today()
-    prev_end = today.replace(day=1) - timedelta(days=1)
-    prev_start = prev_end.replace(day=1)
-    existing = Notification.query.filter(
-        Notification.user_id == user.id,
-        Notification.message.contains('Monthly Summary'),
-        Notification.message.contains(str(prev_start))
-    ).first()
-    if not existing:
+    _, prev_start, prev_end = summary_period('monthly', today)
+    if not notification_exists(user.id, 'monthly_summary', prev_start.isoformat()):
         create_summary_for_user(user, prev_start, prev_end, summary_type='Monthly')
 
-def send_delayed_login_notifications(user_id):
-    with app.app_context():
+def send_login_notifications(user_id):
+    user = db.session.get(User, user_id)
+    if not user:
+        return
+    try:
+        check_low_protein(user.id)
+    except Exception:
+        pass
+    try:
+        check_training_volume_trend(user.id)
+    except Exception:
+        pass
+    try:
+        pref = user.progress_summary_frequency or 'weekly'
+        if pref == 'daily':
+            send_daily_summary_for_user(user)
+        elif pref == 'weekly':
+            send_weekly_summary_for_user(user)
+        elif pref == 'monthly':
+            send_monthly_summary_for_user(user)
+    except Exception:
+        pass
+
+class NotificationScheduler:
+    #one timer thread with a heap of due jobs; jobs run on a bounded pool and are coalesced by key until they finish
+    def __init__(self, app, max_workers=2):
+        self.app = app
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='notifications')
+        self._heap = []
+        self._pending = {}
+        self._counter = itertools.count()
+        self._cond = Condition()
+        self._thread = None
+        self._stopped = False
+
+    def schedule(self, key, delay, func, *args):
+        with self._cond:
+            if self._stopped or key in self._pending:
+                return False
+            self._pending[key] = (func, args)
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), key))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._run, name='notification-scheduler', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return True
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    timeout = self._heap[0][0] - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+                _, _, key = heapq.heappop(self._heap)
+                func, args = self._pending[key]
+            self._executor.submit(self._call, key, func, args)
+
+    def _call(self, key, func, args):
+        #the key stays pending until the job has run, so a burst of logins queues a single job per user
         try:
-            user = db.session.get(User, user_id)
-            if user:
-                send_daily_reminders_for_user(user)
-        except Exception:
-            pass
+            with self.app.app_context():
+                func(*args)
+        finally:
+            with self._cond:
+                self._pending.pop(key, None)
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._stopped = True
+            self._heap.clear()
+            self._pending.clear()
+            self._cond.notify()
+        if self._thread is not None and wait:
+            self._thread.join()
+        self._executor.shutdown(wait=wait)
+
+def create_notification_scheduler(app):
+    scheduler = NotificationScheduler(app, max_workers=app.config['NOTIFICATION_WORKERS'])
+    atexit.register(scheduler.shutdown)
+    return scheduler
+
+notification_scheduler = lazy_resource('notification_scheduler', create_notification_scheduler)
+
+#daily rollups are not purged row by row: they are rebuilt from what is left once the source tables are done,
+#so meals and workouts logged while a purge runs keep correct totals
+PURGE_MODELS = (Notification, Meal, Workout, BodyMeasurement, MealTemplate, WorkoutTemplate)
+
+def purge_user_rows(model, user_id, max_id, chunk_size, progress=None):
+    #each chunk is its own short transaction so other writers get the database lock in between;
+    #rows created after the purge started (id above max_id) are left alone, max_id None removes everything
+    deleted = 0
+    while True:
+        query = db.session.query(model.id).filter(model.user_id == user_id)
+        if max_id is not None:
+            query = query.filter(model.id <= max_id)
+        ids = [row[0] for row in query.order_by(model.id).limit(chunk_size)]
+        if not ids:
+            return deleted
+        model.query.filter(model.id.in_(ids)).delete(synchronize_session=False)
+        mark_user_dirty(user_id)
+        if model is Notification:
+            mark_notifications_dirty({user_id})
+        db.session.commit()
+        deleted += len(ids)
+        if progress:
+            progress(model.__tablename__, deleted)
+
+def purge_user(user_id, delete_user=False, max_ids=None, chunk_size=500, progress=None):
+    for model in PURGE_MODELS:
+        purge_user_rows(model, user_id, max_ids[model] if max_ids else None, chunk_size, progress)
+    rebuild_daily_rollups(user_id)
+    if delete_user:
+        user = db.session.get(User, user_id)
+        if user:
+            db.session.delete(user)
+            db.session.commit()
+    invalidate_user_cache(user_id)
+
+class PurgeJobs:
+    #account wipes run one at a time off the request thread; their status is kept in memory for polling.
+    #a deletion is recorded on the user row before it is queued, so one cut short by a restart is finished
+    #by the purge-deleted-accounts command
+    def __init__(self, app, chunk_size=500, retention=3600):
+        self.app = app
+        self.chunk_size = chunk_size
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='purge')
+        self._jobs = {}
+        self._lock = Lock()
+
+    def submit(self, user_id, delete_user=False):
+        #a deleted account takes everything with it, a clear keeps what is logged after the request
+        max_ids = None if delete_user else {
+            model: db.session.query(db.func.max(model.id)).filter(model.user_id == user_id).scalar() or 0
+            for model in PURGE_MODELS}
+        job_id = secrets.token_urlsafe(16)
+        job = {'id': job_id, 'user_id': user_id, 'delete_user': delete_user, 'state': 'queued',
+               'deleted': {model.__tablename__: 0 for model in PURGE_MODELS}, 'error': None, 'finished_at': None}
+        with self._lock:
+            cutoff = time.time() - self.retention
+            for old_id in [k for k, j in self._jobs.items() if j['finished_at'] and j['finished_at'] < cutoff]:
+                del self._jobs[old_id]
+            self._jobs[job_id] = job
+        self._executor.submit(self._run, job, max_ids)
+        return job_id
+
+    def _run(self, job, max_ids):
+        user_id = job['user_id']
+
+        def progress(table, deleted):
+            job['deleted'][table] = deleted
+
+        with self.app.app_context():
+            job['state'] = 'running'
+            try:
+                purge_user(user_id, job['delete_user'], max_ids, self.chunk_size, progress)
+                job['state'] = 'done'
+            except Exception as e:
+                db.session.rollback()
+                job['error'] = str(e)
+                job['state'] = 'failed'
+            finally:
+                job['finished_at'] = time.time()
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {'id': job['id'], 'state': job['state'], 'deleted': dict(job['deleted']), 'error': job['error']}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+def create_purge_jobs(app):
+    jobs = PurgeJobs(app, chunk_size=app.config['PURGE_CHUNK_SIZE'])
+    atexit.register(jobs.shutdown)
+    return jobs
+
+purge_jobs = lazy_resource('purge_jobs', create_purge_jobs)
+
+@main_bp.cli.command('purge-deleted-accounts')
+def purge_deleted_accounts_command():
+    #finishes account deletions cut short by a restart; safe to run at any time, e.g. after every deploy
+    user_ids = [row[0] for row in db.session.query(User.id).filter(User.deleted_at.isnot(None)).order_by(User.id)]
+    for user_id in user_ids:
+        purge_user(user_id, delete_user=True, chunk_size=current_app.config['PURGE_CHUNK_SIZE'])
+        click.echo(f'Deleted account {user_id}')
+    click.echo(f'{len(user_ids)} account(s) deleted')
+
+@auth_bp.route('/api/purge/<job_id>')
+def purge_status(job_id):
+    #the job id is an unguessable token, so the status stays readable after delete_account logs the user out
+    job = purge_jobs.status(job_id)
+    if job is None:
+        return {'error': 'unknown job'}, 404
+    return job
+
+def enqueue_login_notifications(user_id):
+    #runs the login checks and summaries off the request thread; results show up as notifications
+    return notification_scheduler.schedule(('login_checks', user_id), 0, send_login_notifications, user_id)
 
-@app.errorhandler(404)
+def send_delayed_login_notifications(user_id):
+    try:
+        user = db.session.get(User, user_id)
+        if user:
+            send_daily_reminders_for_user(user)
+    except Exception:
+        pass
+
+@main_bp.app_errorhandler(404)
 def not_found_error(error):
     return render_template('error.html', 
                          error_code=404, 
                          error_message="Page Not Found",
                          error_description="The page you're looking for doesn't exist."), 404
 
-@app.errorhandler(500)
+@main_bp.app_errorhandler(500)
 def internal_error(error):
     db.session.rollback()
     return render_template('error.html', 
@@ -1512,7 +3042,7 @@ def internal_error(error):
                          error_message="Internal Server Error",
                          error_description="Something went wrong on our end. Please try again later."), 500
 
-@app.errorhandler(403)
+@main_bp.app_errorhandler(403)
 def forbidden_error(error):
     return render_template('error.html', 
                          error_code=403, 
@@ -1520,7 +3050,38 @@ def forbidden_error(error):
                          error_description="You don't have permission to access this resource."), 403
 
 
+def create_app(config=None):
+    #config is a name from config.configs, a config class or a mapping; FITTRACK_CONFIG picks the name by default
+    if config is None:
+        config = os.environ.get('FITTRACK_CONFIG', 'default')
+    app = Flask(__name__)
+    if isinstance(config, str):
+        app.config.from_object(configs[config])
+    elif isinstance(config, dict):
+        app.config.from_object(configs['default'])
+        app.config.update(config)
+    else:
+        app.config.from_object(config)
+    app.config.from_prefixed_env('FITTRACK')
+    if not app.config.get('SECRET_KEY'):
+        raise RuntimeError('SECRET_KEY is not configured; set FITTRACK_SECRET_KEY')
+
+    if not app.config['METRICS_CACHE_URL'] and not (app.debug or app.testing):
+        app.logger.warning('METRICS_CACHE_URL is not set; the metrics cache is per process, so with several workers '
+                           'dashboards and unread badges can be up to %s s stale', app.config['METRICS_CACHE_TTL'])
+    db.init_app(app)
+    init_sqlite_engine(app)
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
+    if DebugToolbarExtension is not None and app.debug:
+        DebugToolbarExtension(app)
+    if app.config['PRELOAD_EXERCISE_CATALOG']:
+        exercise_catalog.current()
+    return app
+
+
 if __name__ == '__main__':
+    app = create_app('development')
     with app.app_context():
         db.create_all()
     app.run(debug=True)
@@ -0,0 +1,102 @@
+import random
+from datetime import date, datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from app import (BodyMeasurement, Meal, MealTemplate, Notification, User, Workout, WorkoutTemplate,
+                 calculate_calories_burned, db, get_exercise_data, rebuild_daily_rollups, upsert_templates)
+
+PASSWORD = 'bench-password'
+
+FOODS = [
+    #name, calories, protein, carbs, fats
+    ('Oatmeal with banana', 350, 10, 60, 6),
+    ('Scrambled eggs', 220, 14, 2, 16),
+    ('Greek yogurt', 150, 15, 8, 5),
+    ('Chicken rice bowl', 620, 42, 70, 14),
+    ('Beef burrito', 780, 35, 85, 30),
+    ('Tuna sandwich', 430, 28, 40, 15),
+    ('Salmon with potatoes', 640, 40, 45, 28),
+    ('Pasta bolognese', 710, 32, 90, 22),
+    ('Protein shake', 180, 30, 6, 3),
+    ('Apple', 95, 0.5, 25, 0.3),
+    ('Mixed nuts', 200, 6, 7, 18),
+    ('Nasi goreng', 640, 18, 85, 24),
+]
+
+STRENGTH = ['bench press', 'squats', 'deadlifts', 'rows', 'pull-ups', 'shoulder press', 'lunges', 'hammer curls']
+CARDIO = ['running', 'cycling', 'rowing (machine)']
+
+
+def _chunks(session, model, rows, size=5000):
+    for i in range(0, len(rows), size):
+        session.bulk_insert_mappings(model, rows[i:i + size])
+        session.commit()
+
+
+def generate(users=10, years=1, seed=42, today=None):
+    #same arguments always produce the same rows, so runs on different commits are comparable
+    rng = random.Random(seed)
+    today = today or date.today()
+    start = today - timedelta(days=365 * years - 1)
+    days = [start + timedelta(days=i) for i in range((today - start).days + 1)]
+    password = generate_password_hash(PASSWORD)
+
+    db.session.bulk_insert_mappings(User, [{
+        'username': f'bench{i}', 'password': password, 'security_question': 'pet', 'security_answer': 'bench',
+        'progress_summary_frequency': 'weekly'
+    } for i in range(users)])
+    db.session.commit()
+    user_ids = [u.id for u in User.query.filter(User.username.like('bench%')).order_by(User.id)]
+
+    counts = {'users': len(user_ids), 'meals': 0, 'workouts': 0, 'measurements': 0, 'notifications': 0}
+    for user_id in user_ids:
+        meals, workouts, measurements, notifications = [], [], [], []
+        meal_templates, workout_templates = [], []
+        weight = rng.uniform(55, 95)
+        training_days = set(rng.sample(range(7), 4))
+        for day in days:
+            for _ in range(rng.choice((2, 3, 3, 4))):
+                name, calories, protein, carbs, fats = rng.choice(FOODS)
+                qty = rng.choice((1, 1, 1, 2))
+                meals.append({'user_id': user_id, 'date': day, 'name': name, 'quantity': qty, 'calories': calories * qty,
+                              'protein': protein * qty, 'carbs': carbs * qty, 'fats': fats * qty})
+                meal_templates.append({'name': name, 'calories': calories, 'protein': protein, 'carbs': carbs, 'fats': fats})
+            if day.weekday() in training_days:
+                for name in rng.sample(STRENGTH, 4) + ([rng.choice(CARDIO)] if rng.random() < 0.3 else []):
+                    data = get_exercise_data(name)
+                    if data['exercise_type'] == 'cardio':
+                        sets, reps, load, duration = 0, 0, 0, rng.choice((20, 30, 45))
+                    else:
+                        sets, reps, load, duration = rng.randint(3, 5), rng.randint(5, 12), round(rng.uniform(10, 120), 1), 0
+                    workouts.append({
+                        'user_id': user_id, 'date': day, 'name': name.title(), 'exercise_type': data['exercise_type'],
+                        'muscle_groups': data['muscle_groups'], 'duration': duration, 'sets': sets, 'reps': reps,
+                        'weight': load, 'volume': sets * reps * load, 'intensity': 1.0,
+                        'calories_burned': calculate_calories_burned(data, duration, sets, reps)
+                    })
+                    workout_templates.append({'name': name.title(), 'exercise_type': data['exercise_type'],
+                                              'muscle_groups': data['muscle_groups']})
+            if day.weekday() == 0:
+                weight += rng.uniform(-0.6, 0.5)
+                measurements.append({'user_id': user_id, 'date': day, 'weight': round(weight, 1),
+                                     'body_fat_percentage': round(rng.uniform(12, 30), 1)})
+                week_start = day - timedelta(days=7)
+                notifications.append({
+                    'user_id': user_id, 'message': f'Weekly Summary ({week_start} → {day - timedelta(days=1)})',
+                    'created_at': datetime.combine(day, datetime.min.time()) + timedelta(hours=7),
+                    'is_read': (today - day).days > 14, 'kind': 'weekly_summary', 'period_key': week_start.isoformat()
+                })
+        _chunks(db.session, Meal, meals)
+        _chunks(db.session, Workout, workouts)
+        _chunks(db.session, BodyMeasurement, measurements)
+        _chunks(db.session, Notification, notifications)
+        upsert_templates(MealTemplate, user_id, meal_templates, ('calories', 'protein', 'carbs', 'fats'))
+        upsert_templates(WorkoutTemplate, user_id, workout_templates)
+        db.session.commit()
+        counts['meals'] += len(meals)
+        counts['workouts'] += len(workouts)
+        counts['measurements'] += len(measurements)
+        counts['notifications'] += len(notifications)
+    rebuild_daily_rollups()
+    return counts
@@ -0,0 +1,168 @@
+import argparse
+import json
+import math
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import User, create_app, db, metrics_cache
+from bench.generate import generate
+from bench.scenarios import SCENARIOS
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+_local = threading.local()
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    #only statements issued by the measured request thread count, not background notification jobs
+    if getattr(_local, 'queries', None) is not None:
+        _local.queries += 1
+
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def percentile(values, pct):
+    #nearest rank
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def timed(request):
+    _local.queries = 0
+    started = time.perf_counter()
+    try:
+        response = request()
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        queries, _local.queries = _local.queries, None
+    return elapsed, queries, response.status_code
+
+
+def run_scenario(app, name, users, requests, concurrency, warmup, cold=False):
+    build = SCENARIOS[name]
+
+    def one(i):
+        user_id, username = users[i % len(users)]
+        with app.app_context():
+            request = build(app, user_id, username)
+            if cold:
+                metrics_cache.invalidate(user_id)
+        return timed(request)
+
+    for i in range(warmup):
+        one(i)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, range(warmup, warmup + requests)))
+    latencies = [s[0] for s in samples]
+    queries = [s[1] for s in samples]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if s[2] >= 400),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'mean_ms': round(sum(latencies) / len(latencies), 2),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+        'max_queries': max(queries),
+        'rss_mb': round(current_rss_mb(), 1),
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    #query counts are deterministic, so any increase is a regression; latency gets a tolerance for machine noise
+    regressions = []
+    if baseline.get('config') != results['config']:
+        print('baseline was recorded with different settings, skipping the comparison', file=sys.stderr)
+        return regressions
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        if current['queries_per_request'] > previous['queries_per_request'] + 0.5:
+            regressions.append(f"{name}: queries/request {previous['queries_per_request']} -> {current['queries_per_request']}")
+        if current['p95_ms'] > max(previous['p95_ms'] * (1 + tolerance), previous['p95_ms'] + min_delta_ms):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} ms -> {current['p95_ms']} ms")
+        if current['errors'] > previous['errors']:
+            regressions.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic dataset and measure request latency, query counts and RSS.')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--years', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--cold', action='store_true', help='drop the metrics cache of the user before every request')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='repeatable; defaults to all')
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 slowdown against the baseline')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='p95 changes smaller than this are noise')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SECRET_KEY': 'bench', 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            db.create_all()
+            started = time.perf_counter()
+            dataset = generate(users=args.users, years=args.years, seed=args.seed)
+            generate_seconds = time.perf_counter() - started
+            users = [(u.id, u.username) for u in User.query.order_by(User.id)]
+        #listening on Engine also covers the read-only analytics pool
+        event.listen(Engine, 'before_cursor_execute', _count_query)
+        print(f"generated {dataset} in {generate_seconds:.1f}s", file=sys.stderr)
+
+        results = {
+            'config': {k: getattr(args, k) for k in ('users', 'years', 'seed', 'requests', 'warmup', 'concurrency', 'cold')},
+            'dataset': dataset,
+            'scenarios': {},
+        }
+        for name in args.scenario or SCENARIOS:
+            results['scenarios'][name] = stats = run_scenario(app, name, users, args.requests, args.concurrency, args.warmup, args.cold)
+            print(f"{name:22} p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  "
+                  f"{stats['queries_per_request']:6.2f} q/req  rss {stats['rss_mb']:.0f} MB  errors {stats['errors']}")
+        results['peak_rss_mb'] = round(peak_rss_mb(), 1)
+        with app.app_context():
+            db.engine.dispose()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        return 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_delta_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import itertools
+
+from bench.generate import PASSWORD
+
+
+def _logged_in_client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s['user_id'] = user_id
+    return client
+
+
+def login_burst(app, user_id, username):
+    client = app.test_client()
+    return lambda: client.post('/login', data={'username': username, 'password': PASSWORD})
+
+
+def page(path):
+    def scenario(app, user_id, username):
+        client = _logged_in_client(app, user_id)
+        return lambda: client.get(path)
+    return scenario
+
+
+def notification_polling(app, user_id, username):
+    #steady state polling: the client already holds the ETag from its previous poll
+    client = _logged_in_client(app, user_id)
+    etag = client.get('/api/notifications').headers.get('ETag')
+    return lambda: client.get('/api/notifications', headers={'If-None-Match': etag} if etag else {})
+
+
+_write_turn = itertools.count()
+
+
+def write_and_read(app, user_id, username):
+    #alternates logging a meal with reading analytics; run with --concurrency to check that writers and
+    #the read-only analytics pool share the database without 'database is locked' errors
+    client = _logged_in_client(app, user_id)
+    if next(_write_turn) % 2:
+        return lambda: client.get('/analytics')
+    return lambda: client.post('/api/meals/batch', json=[{'name': 'bench snack', 'calories': 150, 'protein': 5}])
+
+
+#each scenario builds an untimed client for one user and returns the timed request
+SCENARIOS = {
+    'login_burst': login_burst,
+    'dashboard': page('/dashboard'),
+    'analytics': page('/analytics'),
+    'meals_page': page('/meals'),
+    'notification_polling': notification_polling,
+    #writes last so they do not change the data the read scenarios measure
+    'write_and_read': write_and_read,
+}
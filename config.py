@@ -0,0 +1,97 @@
+from sqlalchemy.pool import QueuePool
+
+
+class Config:
+    #every key can be overridden per worker with a FITTRACK_<KEY> environment variable, e.g. FITTRACK_NOTIFICATION_WORKERS=4
+    #there is no SECRET_KEY default outside development and testing, create_app refuses to start without FITTRACK_SECRET_KEY
+    SECRET_KEY = None
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///fittrack.db'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    #sqlite profile: WAL lets readers run alongside the single writer, busy_timeout makes writers queue instead of failing
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,  # ms
+        'mmap_size': 268435456,  # 256 MiB
+        'cache_size': -65536,  # KiB, so 64 MiB per connection
+        'temp_store': 'MEMORY',
+    }
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': QueuePool,
+        'pool_size': 10,
+        'max_overflow': 10,
+        'pool_timeout': 30,
+        'pool_recycle': 3600,
+        'connect_args': {'check_same_thread': False},
+    }
+    ANALYTICS_POOL_SIZE = 5
+    #without a url the metrics cache is an in-process LRU: a write only invalidates the worker that committed it, so
+    #other gunicorn workers and writes from cli commands (import-data, backfill-rollups) can serve dashboards and
+    #unread badges up to METRICS_CACHE_TTL old. Run more than one worker only with a shared redis cache, which
+    #needs the redis package (pip install redis); create_app warns outside debug and testing when it is missing
+    METRICS_CACHE_URL = None  # e.g. redis://localhost:6379/0
+    METRICS_CACHE_MAX_ENTRIES = 4096
+    METRICS_CACHE_TTL = 300  # seconds
+    CACHE_STATS_TOKEN = None  # bearer token that opens /api/cache/stats to monitoring outside debug mode
+    NOTIFICATION_WORKERS = 2
+    LOGIN_REMINDER_DELAY = 10  # seconds
+    NOTIFICATION_STREAM_MAX = 50  # open streams and long-polls per worker
+    NOTIFICATION_STREAM_TIMEOUT = 300  # seconds before a stream is closed and the client reconnects
+    NOTIFICATION_STREAM_HEARTBEAT = 15  # seconds
+    NOTIFICATION_LONG_POLL_TIMEOUT = 25  # seconds
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+    MAX_BATCH_SIZE = 500
+    EXPORT_CHUNK_SIZE = 1000
+    MAX_CONTENT_LENGTH = 64 * 1024 * 1024  # bytes, caps every request body including imports
+    IMPORT_CHUNK_SIZE = 1000
+    IMPORT_MAX_REPORTED_ERRORS = 100
+    PURGE_CHUNK_SIZE = 500
+    PRELOAD_EXERCISE_CATALOG = False
+    #per-request instrumentation; requests over either budget are logged with their slowest statements, None disables a budget
+    SERVER_TIMING = True
+    REQUEST_QUERY_BUDGET = 20
+    REQUEST_LATENCY_BUDGET_MS = 500
+    SLOW_QUERY_COUNT = 3
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    SECRET_KEY = 'W_FitTrack'
+    #used only when flask-debugtoolbar is installed
+    DEBUG_TB_INTERCEPT_REDIRECTS = False
+    DEBUG_TB_PANELS = (
+        'flask_debugtoolbar.panels.versions.VersionDebugPanel',
+        'flask_debugtoolbar.panels.timer.TimerDebugPanel',
+        'flask_debugtoolbar.panels.headers.HeaderDebugPanel',
+        'flask_debugtoolbar.panels.request_vars.RequestVarsDebugPanel',
+        'flask_debugtoolbar.panels.template.TemplateDebugPanel',
+        'flask_debugtoolbar.panels.sqlalchemy.SQLAlchemyDebugPanel',
+        'flask_debugtoolbar.panels.logger.LoggingPanel',
+        'flask_debugtoolbar.panels.route_list.RouteListDebugPanel',
+        'app.QueryTimingPanel',
+    )
+
+
+class ProductionConfig(Config):
+    #query counts and timings are not for every client to read, the budget logging still runs
+    SERVER_TIMING = False
+    #parse the catalog in the master so preloaded workers share it copy-on-write
+    PRELOAD_EXERCISE_CATALOG = True
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SECRET_KEY = 'testing'
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    NOTIFICATION_WORKERS = 1
+    LOGIN_REMINDER_DELAY = 0
+
+
+configs = {
+    'default': Config,
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
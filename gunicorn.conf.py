@@ -0,0 +1,10 @@
+import os
+
+#read by gunicorn from the working directory: FITTRACK_CONFIG=production gunicorn wsgi:app
+#every logged in page holds a notification stream or long-poll for minutes, so workers are threaded;
+#sync workers would be blocked by as many open tabs as there are workers
+preload_app = True
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+worker_class = 'gthread'
+#more threads than NOTIFICATION_STREAM_MAX (50) so open streams never take every thread of a worker
+threads = int(os.environ.get('GUNICORN_THREADS', 64))
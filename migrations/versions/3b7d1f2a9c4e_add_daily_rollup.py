@@ -0,0 +1,59 @@
+"""Add daily rollup table
+
+Revision ID: 3b7d1f2a9c4e
+Revises: cf4e9ce6057e
+Create Date: 2026-10-18 09:12:41.204512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7d1f2a9c4e'
+down_revision = 'cf4e9ce6057e'
+branch_labels = None
+depends_on = None
+
+
+# one row per (user_id, date) that has meals or workouts, same sums as app.rebuild_daily_rollups
+BACKFILL_SQL = '''
+INSERT INTO daily_rollup (user_id, date, meal_count, calories_consumed, protein, carbs, fats,
+                          workout_count, calories_burned, workout_volume)
+SELECT d.user_id, d.date,
+       COALESCE(m.meal_count, 0), COALESCE(m.calories, 0), COALESCE(m.protein, 0), COALESCE(m.carbs, 0), COALESCE(m.fats, 0),
+       COALESCE(w.workout_count, 0), COALESCE(w.calories, 0), COALESCE(w.volume, 0)
+FROM (SELECT user_id, date FROM meal UNION SELECT user_id, date FROM workout) AS d
+LEFT JOIN (SELECT user_id, date, COUNT(id) AS meal_count, SUM(calories) AS calories,
+                  SUM(protein) AS protein, SUM(carbs) AS carbs, SUM(fats) AS fats
+           FROM meal GROUP BY user_id, date) AS m ON m.user_id = d.user_id AND m.date = d.date
+LEFT JOIN (SELECT user_id, date, COUNT(id) AS workout_count, SUM(calories_burned) AS calories,
+                  SUM(COALESCE(sets, 0) * COALESCE(reps, 0) * COALESCE(weight, 0)) AS volume
+           FROM workout GROUP BY user_id, date) AS w ON w.user_id = d.user_id AND w.date = d.date
+WHERE d.user_id IS NOT NULL AND d.date IS NOT NULL
+'''
+
+
+def upgrade():
+    op.create_table('daily_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('calories_consumed', sa.Integer(), nullable=True),
+    sa.Column('calories_burned', sa.Integer(), nullable=True),
+    sa.Column('protein', sa.Float(), nullable=True),
+    sa.Column('carbs', sa.Float(), nullable=True),
+    sa.Column('fats', sa.Float(), nullable=True),
+    sa.Column('workout_volume', sa.Float(), nullable=True),
+    sa.Column('meal_count', sa.Integer(), nullable=True),
+    sa.Column('workout_count', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'date', name='uq_daily_rollup_user_date')
+    )
+
+    # the dashboard and analytics read only rollups, so existing history is aggregated here
+    op.execute(BACKFILL_SQL)
+
+
+def downgrade():
+    op.drop_table('daily_rollup')
@@ -0,0 +1,26 @@
+"""Add user deleted_at
+
+Revision ID: 5a8f3c1e9b72
+Revises: c41a9e6b2d57
+Create Date: 2026-10-18 20:05:41.208113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a8f3c1e9b72'
+down_revision = 'c41a9e6b2d57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('deleted_at')
@@ -0,0 +1,59 @@
+"""Add (user_id, date) indexes and unique template names
+
+Revision ID: 8e2c5a7d41b0
+Revises: 3b7d1f2a9c4e
+Create Date: 2026-10-18 10:03:17.551928
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2c5a7d41b0'
+down_revision = '3b7d1f2a9c4e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_meal_user_id_date', 'meal', ['user_id', 'date'], unique=False)
+    op.create_index('ix_workout_user_id_date', 'workout', ['user_id', 'date'], unique=False)
+    op.create_index('ix_body_measurement_user_id_date', 'body_measurement', ['user_id', 'date'], unique=False)
+    op.create_index('ix_notification_user_id_created_at', 'notification', ['user_id', 'created_at'], unique=False)
+
+    # keep the most used template of each (user_id, name) before enforcing uniqueness; it takes over the
+    # summed frequency of its duplicates so usage counts are merged rather than lost
+    for table in ('meal_template', 'workout_template'):
+        same_name = f'WHERE t2.user_id = {table}.user_id AND t2.name = {table}.name'
+        op.execute(
+            f'UPDATE {table} SET frequency = ('
+            f'SELECT SUM(COALESCE(t2.frequency, 1)) FROM {table} t2 {same_name}) '
+            f'WHERE id = (SELECT t2.id FROM {table} t2 {same_name} ORDER BY t2.frequency DESC, t2.id ASC LIMIT 1) '
+            f'AND (SELECT COUNT(*) FROM {table} t2 {same_name}) > 1'
+        )
+        op.execute(
+            f'DELETE FROM {table} WHERE id NOT IN ('
+            f'SELECT id FROM {table} t WHERE t.id = ('
+            f'SELECT t2.id FROM {table} t2 WHERE t2.user_id = t.user_id AND t2.name = t.name '
+            f'ORDER BY t2.frequency DESC, t2.id ASC LIMIT 1))'
+        )
+
+    with op.batch_alter_table('meal_template', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_meal_template_user_name', ['user_id', 'name'])
+
+    with op.batch_alter_table('workout_template', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_workout_template_user_name', ['user_id', 'name'])
+
+
+def downgrade():
+    with op.batch_alter_table('workout_template', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_workout_template_user_name', type_='unique')
+
+    with op.batch_alter_table('meal_template', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_meal_template_user_name', type_='unique')
+
+    op.drop_index('ix_notification_user_id_created_at', table_name='notification')
+    op.drop_index('ix_body_measurement_user_id_date', table_name='body_measurement')
+    op.drop_index('ix_workout_user_id_date', table_name='workout')
+    op.drop_index('ix_meal_user_id_date', table_name='meal')
@@ -0,0 +1,59 @@
+"""Add notification kind and period key
+
+Revision ID: c41a9e6b2d57
+Revises: 8e2c5a7d41b0
+Create Date: 2026-10-18 13:26:05.117342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41a9e6b2d57'
+down_revision = '8e2c5a7d41b0'
+branch_labels = None
+depends_on = None
+
+
+# (message prefix, kind, SQL expression giving the period key)
+BACKFILL_RULES = [
+    ('Low protein today', 'low_protein', "date(created_at)"),
+    ('You have not logged any meals today', 'meal_reminder', "date(created_at)"),
+    ('No workout logged today', 'workout_reminder', "date(created_at)"),
+    ('Training volume decreased', 'volume_drop', "strftime('%Y-W%W', created_at)"),
+    ('Daily Summary (', 'daily_summary', "substr(message, 16, 10)"),
+    ('Weekly Summary (', 'weekly_summary', "substr(message, 17, 10)"),
+    ('Monthly Summary (', 'monthly_summary', "substr(message, 18, 10)"),
+]
+
+
+def upgrade():
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('kind', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('period_key', sa.String(length=20), nullable=True))
+
+    notification = sa.table('notification',
+                            sa.column('message', sa.String),
+                            sa.column('kind', sa.String),
+                            sa.column('period_key', sa.String))
+    for prefix, kind, period_key in BACKFILL_RULES:
+        op.execute(notification.update()
+                   .where(notification.c.message.startswith(prefix))
+                   .values(kind=kind, period_key=sa.text(period_key)))
+
+    # the oldest row of each (user_id, kind, period_key) keeps the dedup key; newer duplicates keep their
+    # message but lose kind and period_key so the unique index can be built
+    op.execute(
+        'UPDATE notification SET kind = NULL, period_key = NULL '
+        'WHERE kind IS NOT NULL AND id NOT IN ('
+        'SELECT MIN(id) FROM notification WHERE kind IS NOT NULL GROUP BY user_id, kind, period_key)'
+    )
+    op.create_index('uq_notification_user_id_kind_period_key', 'notification', ['user_id', 'kind', 'period_key'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_notification_user_id_kind_period_key', table_name='notification')
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.drop_column('period_key')
+        batch_op.drop_column('kind')
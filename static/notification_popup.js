@@ -48,38 +48,82 @@ function markNotificationRead(id) {
     fetch(`/api/notifications/read/${id}`, {method: 'POST'});
 }
 
+let shownNotificationIds = new Set();
+let lastNotificationId = 0;
+let streamErrors = 0;
+
+function handleNotification(n) {
+    if (shownNotificationIds.has(n.id)) return;
+    shownNotificationIds.add(n.id);
+    lastNotificationId = Math.max(lastNotificationId, n.id);
+    console.log('[Notifications] Showing: ' + n.message);
+    showNotification(n.message, n.id);
+}
+
 function pollNotifications() {
-    fetch('/api/notifications')
+    return fetch('/api/notifications')
         .then(r => r.json())
         .then(data => {
             console.log('[Notifications] Polled /api/notifications, got:', data);
             if (data.notifications && data.notifications.length > 0) {
                 console.log('[Notifications] Showing ' + data.notifications.length + ' notifications');
-                
-                data.notifications.forEach((n) => {
-                    console.log('[Notifications] Showing: ' + n.message);
-                    showNotification(n.message, n.id);
-                });
+                data.notifications.forEach(handleNotification);
             }
         })
         .catch(err => console.error('[Notifications] Poll error:', err));
 }
 
+function longPollNotifications() {
+    fetch(`/api/notifications/poll?since_id=${lastNotificationId}`)
+        .then(r => {
+            if (r.status === 401) return null;
+            if (!r.ok) throw new Error('HTTP ' + r.status);
+            return r.json();
+        })
+        .then(data => {
+            if (data === null) {
+                console.log('[Notifications] Logged out, stopping');
+                return;
+            }
+            const notes = data.notifications || [];
+            notes.forEach(handleNotification);
+            setTimeout(longPollNotifications, notes.length > 0 ? 0 : 5000);
+        })
+        .catch(err => {
+            console.error('[Notifications] Long-poll error:', err);
+            setTimeout(longPollNotifications, 30000);
+        });
+}
 
-if (document.readyState === 'loading') {
-    window.addEventListener('DOMContentLoaded', () => {
-        console.log('[Notifications] Page loaded, starting poll...');
-        pollNotifications();
+function streamNotifications() {
+    if (!window.EventSource) {
+        console.log('[Notifications] EventSource unsupported, falling back to long-poll');
+        longPollNotifications();
+        return;
+    }
+    const source = new EventSource(`/api/notifications/stream?since_id=${lastNotificationId}`);
+    source.addEventListener('notification', (e) => {
+        streamErrors = 0;
+        handleNotification(JSON.parse(e.data));
     });
-} else {
-    console.log('[Notifications] Page already loaded, starting poll...');
-    pollNotifications();
+    source.onopen = () => { streamErrors = 0; };
+    source.onerror = () => {
+        streamErrors += 1;
+        if (source.readyState === EventSource.CLOSED || streamErrors >= 3) {
+            console.log('[Notifications] Stream unavailable, falling back to long-poll');
+            source.close();
+            longPollNotifications();
+        }
+    };
 }
 
-setTimeout(() => {
-    console.log('[Notifications] Polling for delayed login notifications...');
-    pollNotifications();
-}, 12000);
+function startNotifications() {
+    console.log('[Notifications] Page loaded, starting stream...');
+    pollNotifications().then(streamNotifications);
+}
 
-console.log('[Notifications] Starting polling every 90 seconds');
-setInterval(pollNotifications, 90000);  
+if (document.readyState === 'loading') {
+    window.addEventListener('DOMContentLoaded', startNotifications);
+} else {
+    startNotifications();
+}
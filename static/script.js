@@ -367,16 +367,19 @@ document.addEventListener('DOMContentLoaded', function() {
     const confirmBtn = document.getElementById('confirmDeleteBtn');
     const bsModal = modalEl && typeof bootstrap !== 'undefined' ? new bootstrap.Modal(modalEl) : null;
 
-    document.querySelectorAll('form.confirm-delete').forEach(form => {
-        form.addEventListener('submit', e => {
-            e.preventDefault();
-            currentForm = form;
-            const name = form.dataset.itemName || 'this item';
-            if (itemNameEl) itemNameEl.textContent = name;
-            if (bsModal) bsModal.show();
-            else if (confirm('Are you sure you want to delete ' + name + '?')) currentForm.submit();
+    function bindConfirmDeleteForms(root) {
+        root.querySelectorAll('form.confirm-delete').forEach(form => {
+            form.addEventListener('submit', e => {
+                e.preventDefault();
+                currentForm = form;
+                const name = form.dataset.itemName || 'this item';
+                if (itemNameEl) itemNameEl.textContent = name;
+                if (bsModal) bsModal.show();
+                else if (confirm('Are you sure you want to delete ' + name + '?')) currentForm.submit();
+            });
         });
-    });
+    }
+    bindConfirmDeleteForms(document);
 
     if (confirmBtn) {
         confirmBtn.addEventListener('click', () => {
@@ -463,31 +466,31 @@ document.addEventListener('DOMContentLoaded', function() {
 
     
     const selectAllCheckbox = document.getElementById('select-all');
-    const mealCheckboxes = document.querySelectorAll('.meal-checkbox');
+    const mealCheckboxes = () => document.querySelectorAll('.meal-checkbox');
     const bulkDeleteBtn = document.getElementById('bulk-delete-btn');
     const bulkDeleteForm = document.getElementById('bulk-delete-form');
 
-    if (selectAllCheckbox && mealCheckboxes.length > 0 && bulkDeleteBtn) {
+    if (selectAllCheckbox && mealCheckboxes().length > 0 && bulkDeleteBtn) {
         selectAllCheckbox.addEventListener('change', () => {
-            mealCheckboxes.forEach(cb => cb.checked = selectAllCheckbox.checked);
+            mealCheckboxes().forEach(cb => cb.checked = selectAllCheckbox.checked);
             toggleBulkDeleteBtn();
         });
 
-        mealCheckboxes.forEach(cb => {
-            cb.addEventListener('change', () => {
-                selectAllCheckbox.checked = [...mealCheckboxes].every(cb => cb.checked);
+        document.addEventListener('change', (e) => {
+            if (e.target.matches('.meal-checkbox')) {
+                selectAllCheckbox.checked = [...mealCheckboxes()].every(cb => cb.checked);
                 toggleBulkDeleteBtn();
-            });
+            }
         });
 
         function toggleBulkDeleteBtn() {
-            const anyChecked = [...mealCheckboxes].some(cb => cb.checked);
+            const anyChecked = [...mealCheckboxes()].some(cb => cb.checked);
             bulkDeleteBtn.style.display = anyChecked ? 'inline-block' : 'none';
         }
 
         bulkDeleteBtn.addEventListener('click', (e) => {
             e.preventDefault();
-            const selectedCheckboxes = [...mealCheckboxes].filter(cb => cb.checked);
+            const selectedCheckboxes = [...mealCheckboxes()].filter(cb => cb.checked);
             const selectedCount = selectedCheckboxes.length;
             if (itemNameEl) itemNameEl.textContent = `${selectedCount} selected meal(s)`;
             if (bsModal) {
@@ -509,31 +512,31 @@ document.addEventListener('DOMContentLoaded', function() {
 
     
     const selectAllWorkoutsCheckbox = document.getElementById('select-all-workouts');
-    const workoutCheckboxes = document.querySelectorAll('.workout-checkbox');
+    const workoutCheckboxes = () => document.querySelectorAll('.workout-checkbox');
     const bulkDeleteWorkoutBtn = document.getElementById('bulk-delete-workout-btn');
     const bulkDeleteWorkoutForm = document.getElementById('bulk-delete-workout-form');
 
-    if (selectAllWorkoutsCheckbox && workoutCheckboxes.length > 0 && bulkDeleteWorkoutBtn) {
+    if (selectAllWorkoutsCheckbox && workoutCheckboxes().length > 0 && bulkDeleteWorkoutBtn) {
         selectAllWorkoutsCheckbox.addEventListener('change', () => {
-            workoutCheckboxes.forEach(cb => cb.checked = selectAllWorkoutsCheckbox.checked);
+            workoutCheckboxes().forEach(cb => cb.checked = selectAllWorkoutsCheckbox.checked);
             toggleBulkDeleteWorkoutBtn();
         });
 
-        workoutCheckboxes.forEach(cb => {
-            cb.addEventListener('change', () => {
-                selectAllWorkoutsCheckbox.checked = [...workoutCheckboxes].every(cb => cb.checked);
+        document.addEventListener('change', (e) => {
+            if (e.target.matches('.workout-checkbox')) {
+                selectAllWorkoutsCheckbox.checked = [...workoutCheckboxes()].every(cb => cb.checked);
                 toggleBulkDeleteWorkoutBtn();
-            });
+            }
         });
 
         function toggleBulkDeleteWorkoutBtn() {
-            const anyChecked = [...workoutCheckboxes].some(cb => cb.checked);
+            const anyChecked = [...workoutCheckboxes()].some(cb => cb.checked);
             bulkDeleteWorkoutBtn.style.display = anyChecked ? 'inline-block' : 'none';
         }
 
         bulkDeleteWorkoutBtn.addEventListener('click', (e) => {
             e.preventDefault();
-            const selectedCheckboxes = [...workoutCheckboxes].filter(cb => cb.checked);
+            const selectedCheckboxes = [...workoutCheckboxes()].filter(cb => cb.checked);
             const selectedCount = selectedCheckboxes.length;
             if (itemNameEl) itemNameEl.textContent = `${selectedCount} selected workout(s)`;
             if (bsModal) {
@@ -555,31 +558,31 @@ document.addEventListener('DOMContentLoaded', function() {
 
     
     const selectAllNotificationsCheckbox = document.getElementById('select-all-notifications');
-    const notificationCheckboxes = document.querySelectorAll('.notification-checkbox');
+    const notificationCheckboxes = () => document.querySelectorAll('.notification-checkbox');
     const bulkDeleteNotificationBtn = document.getElementById('bulk-delete-notification-btn');
     const bulkDeleteNotificationForm = document.getElementById('bulk-delete-notification-form');
 
-    if (selectAllNotificationsCheckbox && notificationCheckboxes.length > 0 && bulkDeleteNotificationBtn) {
+    if (selectAllNotificationsCheckbox && notificationCheckboxes().length > 0 && bulkDeleteNotificationBtn) {
         selectAllNotificationsCheckbox.addEventListener('change', () => {
-            notificationCheckboxes.forEach(cb => cb.checked = selectAllNotificationsCheckbox.checked);
+            notificationCheckboxes().forEach(cb => cb.checked = selectAllNotificationsCheckbox.checked);
             toggleBulkDeleteNotificationBtn();
         });
 
-        notificationCheckboxes.forEach(cb => {
-            cb.addEventListener('change', () => {
-                selectAllNotificationsCheckbox.checked = [...notificationCheckboxes].every(cb => cb.checked);
+        document.addEventListener('change', (e) => {
+            if (e.target.matches('.notification-checkbox')) {
+                selectAllNotificationsCheckbox.checked = [...notificationCheckboxes()].every(cb => cb.checked);
                 toggleBulkDeleteNotificationBtn();
-            });
+            }
         });
 
         function toggleBulkDeleteNotificationBtn() {
-            const anyChecked = [...notificationCheckboxes].some(cb => cb.checked);
+            const anyChecked = [...notificationCheckboxes()].some(cb => cb.checked);
             bulkDeleteNotificationBtn.style.display = anyChecked ? 'inline-block' : 'none';
         }
 
         bulkDeleteNotificationBtn.addEventListener('click', (e) => {
             e.preventDefault();
-            const selectedCheckboxes = [...notificationCheckboxes].filter(cb => cb.checked);
+            const selectedCheckboxes = [...notificationCheckboxes()].filter(cb => cb.checked);
             const selectedCount = selectedCheckboxes.length;
             if (itemNameEl) itemNameEl.textContent = `${selectedCount} selected notification(s)`;
             if (bsModal) {
@@ -600,4 +603,56 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
 
+        
+    document.querySelectorAll('button.load-more').forEach(btn => {
+        const target = document.querySelector(btn.dataset.target);
+        let loading = false;
+
+        function loadMore() {
+            if (loading || !btn.dataset.cursor) return;
+            loading = true;
+            btn.disabled = true;
+            fetch(`${btn.dataset.url}?cursor=${encodeURIComponent(btn.dataset.cursor)}`)
+                .then(r => r.json())
+                .then(data => {
+                    const holder = document.createElement('ul');
+                    holder.innerHTML = data.html;
+                    bindConfirmDeleteForms(holder);
+                    [...holder.children].forEach(li => target.appendChild(li));
+                    if (data.next_cursor) {
+                        btn.dataset.cursor = data.next_cursor;
+                        btn.disabled = false;
+                    } else {
+                        btn.remove();
+                        if (observer) observer.disconnect();
+                    }
+                })
+                .catch(err => {
+                    console.error('Load more failed:', err);
+                    btn.disabled = false;
+                })
+                .finally(() => { loading = false; });
+        }
+
+        btn.addEventListener('click', loadMore);
+        const observer = window.IntersectionObserver
+            ? new IntersectionObserver(entries => { if (entries.some(e => e.isIntersecting)) loadMore(); }, {rootMargin: '200px'})
+            : null;
+        if (observer) observer.observe(btn);
     });
+
+    const purgeStatus = document.getElementById('purge-status');
+    if (purgeStatus) {
+        const pollPurge = () => {
+            fetch(purgeStatus.dataset.url)
+                .then(r => r.json())
+                .then(job => {
+                    const deleted = Object.values(job.deleted || {}).reduce((a, b) => a + b, 0);
+                    purgeStatus.textContent = `Clearing logs: ${job.state} (${deleted} rows removed)`;
+                    if (job.state === 'queued' || job.state === 'running') setTimeout(pollPurge, 1000);
+                })
+                .catch(err => console.error('Purge status failed:', err));
+        };
+        pollPurge();
+    }
+});
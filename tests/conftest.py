@@ -0,0 +1,38 @@
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import User, create_app, db
+
+PASSWORD = 'secret-password'
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        #background workers first, they share the in-memory database
+        for resource in app.extensions.get('fittrack', {}).values():
+            if hasattr(resource, 'shutdown'):
+                resource.shutdown()
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username='alice', password=generate_password_hash(PASSWORD),
+                security_question='pet', security_answer='rex')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, user):
+    #logged in without going through /login, which would start the background notification checks
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s['user_id'] = user.id
+    return client
@@ -0,0 +1,54 @@
+from app import DailyRollup, Meal, MealTemplate, Workout, WorkoutTemplate, db
+
+DAY = '2026-01-05'
+
+
+def test_meal_batch_inserts_meals_templates_and_rollups(app, client, user):
+    db.session.add(MealTemplate(user_id=user.id, name='oats', calories=150, protein=5, carbs=27, fats=3, frequency=4))
+    db.session.commit()
+    response = client.post('/api/meals/batch', json={'meals': [
+        {'name': 'oats', 'calories': 160, 'protein': 6, 'date': DAY},
+        {'name': 'oats', 'calories': 160, 'protein': 6, 'quantity': 2, 'date': DAY},
+        {'name': 'egg', 'calories': 80, 'protein': 6, 'date': DAY},
+    ]})
+    assert response.status_code == 201
+    assert response.json == {'created': 3}
+    assert Meal.query.filter_by(user_id=user.id).count() == 3
+    templates = {t.name: t for t in MealTemplate.query.filter_by(user_id=user.id)}
+    assert templates['oats'].frequency == 6
+    assert templates['oats'].calories == 160
+    assert templates['egg'].frequency == 1
+    rollup = DailyRollup.query.filter_by(user_id=user.id).one()
+    assert (rollup.meal_count, rollup.calories_consumed) == (3, 160 + 320 + 80)
+
+
+def test_meal_batch_is_all_or_nothing(app, client, user):
+    response = client.post('/api/meals/batch', json=[{'name': 'egg', 'calories': 80}, {'name': '', 'calories': 1},
+                                                     {'name': 'rice', 'calories': 'lots'}])
+    assert response.status_code == 400
+    assert response.json['errors'] == [{'index': 1, 'error': 'Meal name required'},
+                                       {'index': 2, 'error': 'Invalid values'}]
+    assert Meal.query.count() == 0
+
+
+def test_meal_batch_size_is_capped(app, client):
+    app.config['MAX_BATCH_SIZE'] = 2
+    response = client.post('/api/meals/batch', json=[{'name': 'egg', 'calories': 80}] * 3)
+    assert response.status_code == 413
+
+
+def test_workout_session_computes_calories_and_volume(app, client, user):
+    response = client.post('/api/workouts/session', json={'date': DAY, 'exercises': [
+        {'name': 'Sled push', 'is_custom': True, 'custom_type': 'strength', 'custom_calories_per_hour': 400,
+         'sets': 3, 'reps': 10, 'weight': 50},
+        {'name': 'Rower', 'is_custom': True, 'custom_type': 'cardio', 'custom_calories_per_hour': 600, 'duration': 30},
+    ]})
+    assert response.status_code == 201
+    assert response.json['created'] == 2
+    assert response.json['volume'] == 1500
+    assert Workout.query.filter_by(user_id=user.id).count() == 2
+    assert Workout.query.filter_by(name='Rower').one().calories_burned == 300
+    assert WorkoutTemplate.query.filter_by(user_id=user.id).count() == 2
+    rollup = DailyRollup.query.filter_by(user_id=user.id).one()
+    assert rollup.workout_count == 2
+    assert rollup.workout_volume == 1500
@@ -0,0 +1,76 @@
+from datetime import date
+
+from app import (LRUCache, Meal, cached_user_metrics, compute_period_metrics, create_app, db, metrics_cache,
+                 refresh_daily_rollups)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set(1, 'a', 1)
+    cache.set(1, 'b', 2)
+    cache.get(1, 'a')
+    cache.set(1, 'c', 3)
+    assert cache.get(1, 'b') is None
+    assert cache.get(1, 'a') == 1
+    assert cache.info()['evictions'] == 1
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(ttl=-1)
+    cache.set(1, 'a', 1)
+    assert cache.get(1, 'a') is None
+
+
+def test_invalidate_is_per_user():
+    cache = LRUCache()
+    cache.set(1, 'a', 1)
+    cache.set(2, 'a', 2)
+    cache.invalidate(1)
+    assert cache.get(1, 'a') is None
+    assert cache.get(2, 'a') == 2
+    cache.invalidate()
+    assert cache.get(2, 'a') is None
+
+
+def test_value_computed_before_an_invalidation_is_not_stored():
+    cache = LRUCache()
+    version = cache.version(1)
+    cache.invalidate(1)
+    cache.set(1, 'a', 'stale', version)
+    assert cache.get(1, 'a') is None
+    version = cache.version(1)
+    cache.invalidate()
+    cache.set(1, 'a', 'stale', version)
+    assert cache.get(1, 'a') is None
+
+
+def test_cached_metrics_skip_a_write_that_lands_during_compute(app, user):
+    def compute():
+        metrics_cache.invalidate(user.id)
+        return 'stale'
+
+    assert cached_user_metrics(user.id, 'field', compute) == 'stale'
+    assert metrics_cache.get(user.id, 'field') is None
+
+
+def test_commit_invalidates_period_metrics(app, user):
+    today = date.today()
+    assert compute_period_metrics(user.id, today, today)['calories_consumed'] == 0
+    db.session.add(Meal(user_id=user.id, name='egg', calories=80, protein=6, carbs=1, fats=5, quantity=1, date=today))
+    refresh_daily_rollups(user.id, {today})
+    db.session.commit()
+    assert compute_period_metrics(user.id, today, today)['calories_consumed'] == 80
+
+
+def test_cache_stats_needs_the_token(app, client):
+    assert client.get('/api/cache/stats').status_code == 404
+    app.config['CACHE_STATS_TOKEN'] = 'monitor'
+    assert client.get('/api/cache/stats').status_code == 401
+    response = client.get('/api/cache/stats', headers={'Authorization': 'Bearer monitor'})
+    assert response.status_code == 200
+    assert response.json['backend'] == 'memory'
+
+
+def test_production_without_a_shared_cache_warns(caplog):
+    create_app({'SECRET_KEY': 'x', 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SQLALCHEMY_ENGINE_OPTIONS': {}})
+    assert 'METRICS_CACHE_URL is not set' in caplog.text
@@ -0,0 +1,30 @@
+import pytest
+
+from app import create_app
+
+DATABASE = {'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SQLALCHEMY_ENGINE_OPTIONS': {}}
+
+
+@pytest.mark.parametrize('config', ['default', 'production'])
+def test_refuses_to_start_without_a_secret_key(monkeypatch, config):
+    monkeypatch.delenv('FITTRACK_SECRET_KEY', raising=False)
+    monkeypatch.setenv('FITTRACK_SQLALCHEMY_DATABASE_URI', '"sqlite://"')
+    with pytest.raises(RuntimeError, match='FITTRACK_SECRET_KEY'):
+        create_app(config)
+
+
+def test_secret_key_comes_from_the_environment(monkeypatch):
+    monkeypatch.setenv('FITTRACK_SECRET_KEY', 'from-env')
+    assert create_app(DATABASE).secret_key == 'from-env'
+
+
+def test_server_timing_is_off_in_production(monkeypatch, tmp_path):
+    monkeypatch.setenv('FITTRACK_SECRET_KEY', 'from-env')
+    monkeypatch.setenv('FITTRACK_SQLALCHEMY_DATABASE_URI', f'"sqlite:///{tmp_path / "fittrack.db"}"')
+    monkeypatch.setenv('FITTRACK_PRELOAD_EXERCISE_CATALOG', 'false')
+    app = create_app('production')
+    assert 'Server-Timing' not in app.test_client().get('/login').headers
+
+
+def test_server_timing_reports_queries(client):
+    assert 'queries' in client.get('/dashboard').headers['Server-Timing']
@@ -0,0 +1,39 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date
+
+from app import Meal, db
+
+
+def add_meal(user_id, name):
+    db.session.add(Meal(user_id=user_id, name=name, calories=100, protein=1, carbs=2, fats=3, quantity=1, date=date(2026, 1, 2)))
+    db.session.commit()
+
+
+def test_csv_export_streams_only_the_users_rows(app, client, user):
+    add_meal(user.id, 'mine, with a comma')
+    add_meal(user.id + 1, 'someone else')
+    response = client.get('/export/meals?format=csv')
+    assert response.status_code == 200
+    assert response.is_streamed
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0][:3] == ['id', 'date', 'name']
+    assert [row[2] for row in rows[1:]] == ['mine, with a comma']
+
+
+def test_json_export_is_gzipped_when_accepted(app, client, user):
+    app.config['EXPORT_CHUNK_SIZE'] = 2
+    for i in range(5):
+        add_meal(user.id, f'meal {i}')
+    response = client.get('/export/meals?format=json', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    meals = json.loads(gzip.decompress(response.get_data()))
+    assert [m['name'] for m in meals] == [f'meal {i}' for i in range(5)]
+    assert meals[0]['date'] == '2026-01-02'
+
+
+def test_export_rejects_unknown_datasets_and_formats(client):
+    assert client.get('/export/passwords').status_code == 404
+    assert client.get('/export/meals?format=xml').status_code == 400
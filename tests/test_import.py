@@ -0,0 +1,94 @@
+import io
+import json
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import app as fittrack
+from app import DailyRollup, Meal, MealTemplate, db, iter_json_entries
+
+ENTRIES = [{'name': 'egg', 'calories': 80, 'vegan': False, 'note': None, 'serving': 1.5, 'tags': ['a', 'b,]']},
+           {'name': 'rice "white"', 'calories': 200, 'vegan': True, 'note': 'ü', 'serving': -2e3, 'tags': []}]
+
+
+class CountingStream(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = 0
+
+    def read1(self, size=-1):
+        self.reads += 1
+        return super().read1(size)
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+@pytest.mark.parametrize('text', [json.dumps(ENTRIES, indent=1), '\n'.join(json.dumps(e) for e in ENTRIES) + '\n'])
+def test_json_entries_decode_across_any_read_boundary(text):
+    for read_size in range(1, 12):
+        entries = list(iter_json_entries(io.BytesIO(text.encode()), read_size=read_size))
+        assert entries == [(1, ENTRIES[0]), (2, ENTRIES[1])]
+
+
+def test_malformed_json_fails_without_reading_the_rest():
+    stream = CountingStream(('[{"name": "egg", "calories": }, ' + json.dumps(ENTRIES[0]) * 20000 + ']').encode())
+    with pytest.raises(ValueError, match='after entry 0'):
+        list(iter_json_entries(stream, read_size=64))
+    assert stream.reads < 10
+
+
+def test_truncated_json_is_malformed():
+    with pytest.raises(ValueError):
+        list(iter_json_entries(io.BytesIO(b'[{"name": "egg"')))
+
+
+def test_csv_import_reports_bad_rows_and_builds_rollups(app, client, user):
+    body = 'name,calories,protein,date\negg,80,6,2026-01-02\n,10,1,2026-01-02\negg,80,6,2026-01-02\n'
+    response = client.post('/import/meals', data=body, content_type='text/csv')
+    assert response.status_code == 200
+    assert response.json['imported'] == 2
+    assert response.json['errors'] == [{'row': 3, 'error': 'Meal name required'}]
+    assert MealTemplate.query.filter_by(user_id=user.id, name='egg').one().frequency == 2
+    assert DailyRollup.query.filter_by(user_id=user.id).one().calories_consumed == 160
+
+
+def test_failed_chunk_keeps_committed_rows_consistent(app, client, user, monkeypatch):
+    app.config['IMPORT_CHUNK_SIZE'] = 2
+    insert, calls = db.session.bulk_insert_mappings, []
+
+    def locked_on_second_chunk(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise OperationalError('INSERT', {}, Exception('database is locked'))
+        return insert(*args, **kwargs)
+
+    monkeypatch.setattr(db.session, 'bulk_insert_mappings', locked_on_second_chunk)
+    body = 'name,calories,date\n' + 'egg,80,2026-01-02\n' * 5
+    response = client.post('/import/meals', data=body, content_type='text/csv')
+    assert response.status_code == 200
+    assert response.json['imported'] == 2
+    assert response.json['errors'] == [{'row': None, 'error': 'Stopped importing: database is locked'}]
+    assert Meal.query.count() == 2
+    assert MealTemplate.query.filter_by(name='egg').one().frequency == 2
+    assert DailyRollup.query.one().calories_consumed == 160
+
+
+def test_failed_rebuild_after_a_failed_chunk_still_answers(app, client, user, monkeypatch):
+    app.config['IMPORT_CHUNK_SIZE'] = 1
+    monkeypatch.setattr(db.session, 'bulk_insert_mappings', lambda *a, **k: (_ for _ in ()).throw(
+        OperationalError('INSERT', {}, Exception('database is locked'))))
+    monkeypatch.setattr(fittrack, 'upsert_templates', lambda *a, **k: (_ for _ in ()).throw(
+        OperationalError('INSERT', {}, Exception('database is locked'))))
+    response = client.post('/import/meals', data='name,calories\negg,80\n', content_type='text/csv')
+    assert response.status_code == 200
+    assert [e['error'] for e in response.json['errors']] == [
+        'Stopped importing: database is locked',
+        'Templates and daily totals were not updated; run flask backfill-rollups']
+
+
+def test_upload_size_is_capped(app, client):
+    app.config['MAX_CONTENT_LENGTH'] = 100
+    response = client.post('/import/meals', data='name,calories\n' + 'egg,80\n' * 50, content_type='text/csv')
+    assert response.status_code == 413
@@ -0,0 +1,64 @@
+import json
+import threading
+
+from app import create_notification, notification_broker
+
+
+def read_event(response):
+    for chunk in response.response:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith('id:'):
+            return json.loads(chunk.split('data: ', 1)[1])
+    return None
+
+
+def close_outside_app_context(response):
+    #the server closes a finished stream after the request context is gone; the fixture's context is thread local
+    closer = threading.Thread(target=response.close)
+    closer.start()
+    closer.join()
+
+
+def test_closing_a_stream_releases_its_subscription(app, client):
+    response = client.get('/api/notifications/stream', buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    next(response.response)
+    assert notification_broker.open_count() == 1
+    close_outside_app_context(response)
+    assert notification_broker.open_count() == 0
+
+
+def test_stream_delivers_the_backlog_after_last_event_id(app, client, user):
+    first = create_notification(user.id, 'first')
+    second = create_notification(user.id, 'second')
+    #the stale since_id in the url loses against the header the browser sends on reconnect
+    response = client.get('/api/notifications/stream?since_id=0', headers={'Last-Event-ID': str(first.id)}, buffered=False)
+    try:
+        assert read_event(response)['id'] == second.id
+    finally:
+        close_outside_app_context(response)
+    assert notification_broker.open_count() == 0
+
+
+def test_stream_over_the_cap_is_refused(app, client):
+    app.config['NOTIFICATION_STREAM_MAX'] = 0
+    response = client.get('/api/notifications/stream')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '30'
+
+
+def test_long_poll_returns_new_notifications(app, client, user):
+    note = create_notification(user.id, 'hello')
+    response = client.get('/api/notifications/poll?since_id=0')
+    assert [n['id'] for n in response.json['notifications']] == [note.id]
+    assert notification_broker.open_count() == 0
+
+
+def test_long_poll_without_a_session_is_refused(app):
+    assert app.test_client().get('/api/notifications/poll').status_code == 401
+
+
+def test_duplicate_notification_is_dropped(app, user):
+    assert create_notification(user.id, 'Low protein', kind='low_protein', period_key='2026-01-01') is not None
+    assert create_notification(user.id, 'Low protein', kind='low_protein', period_key='2026-01-01') is None
@@ -0,0 +1,37 @@
+from app import NOTIFICATION_STATE_FIELD, Notification, create_notification, db, metrics_cache
+
+
+def test_unchanged_notifications_answer_304(app, client, user):
+    create_notification(user.id, 'hello')
+    first = client.get('/api/notifications')
+    assert first.status_code == 200
+    assert len(first.json['notifications']) == 1
+    again = client.get('/api/notifications', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_etag_changes_when_a_notification_is_read(app, client, user):
+    note = create_notification(user.id, 'hello')
+    etag = client.get('/api/notifications').headers['ETag']
+    assert client.post(f'/api/notifications/read/{note.id}').status_code == 204
+    response = client.get('/api/notifications', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['notifications'] == []
+
+
+def test_etag_ignores_a_stale_cached_state(app, client, user):
+    etag = client.get('/api/notifications').headers['ETag']
+    db.session.execute(db.insert(Notification).values(user_id=user.id, message='from the cli', is_read=False))
+    db.session.commit()
+    #as left behind when the write came from another process and skipped this worker's invalidation
+    metrics_cache.set(user.id, NOTIFICATION_STATE_FIELD, {'latest_id': 0, 'unread': 0})
+    response = client.get('/api/notifications', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [n['message'] for n in response.json['notifications']] == ['from the cli']
+
+
+def test_since_id_returns_only_newer_notifications(app, client, user):
+    first = create_notification(user.id, 'first')
+    second = create_notification(user.id, 'second')
+    response = client.get(f'/api/notifications?since_id={first.id}')
+    assert [n['id'] for n in response.json['notifications']] == [second.id]
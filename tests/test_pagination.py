@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+
+from app import Meal, db, meals_page
+
+
+def add_meals(user, days):
+    start = date(2026, 1, 1)
+    meals = [Meal(user_id=user.id, name=f'meal {i}', calories=100, protein=1, carbs=1, fats=1, quantity=1,
+                  date=start + timedelta(days=day)) for i, day in enumerate(days)]
+    db.session.add_all(meals)
+    db.session.commit()
+    return meals
+
+
+def test_keyset_pages_cover_every_row_once_newest_first(app, user):
+    meals = add_meals(user, [0, 3, 3, 1, 3, 2, 0])
+    seen, cursor = [], None
+    with app.test_request_context('/?page_size=3'):
+        while True:
+            items, cursor = meals_page(user.id, cursor)
+            seen.extend(items)
+            if cursor is None:
+                break
+    assert len(seen) == len(meals)
+    assert [(m.date, m.id) for m in seen] == sorted(((m.date, m.id) for m in meals), reverse=True)
+
+
+def test_rows_added_after_the_first_page_do_not_shift_later_pages(app, user):
+    meals = add_meals(user, [0, 1, 2, 3])
+    with app.test_request_context('/?page_size=2'):
+        first, cursor = meals_page(user.id)
+        add_meals(user, [5])
+        second, cursor = meals_page(user.id, cursor)
+    assert [m.id for m in first + second] == [m.id for m in reversed(meals)]
+    assert cursor is None
+
+
+def test_page_api_rejects_a_malformed_cursor(client):
+    assert client.get('/api/meals/page?cursor=not-a-cursor').status_code == 400
+    response = client.get('/api/meals/page')
+    assert response.status_code == 200
+    assert response.json['next_cursor'] is None
@@ -0,0 +1,91 @@
+import time
+from datetime import date, datetime
+
+from app import (PURGE_MODELS, DailyRollup, Meal, MealTemplate, Notification, User, create_notification, db,
+                 purge_jobs, purge_user, rebuild_daily_rollups)
+from tests.conftest import PASSWORD
+
+DAY = date(2026, 1, 2)
+
+
+def add_history(user_id, meals=5):
+    db.session.add_all(Meal(user_id=user_id, name='egg', calories=80, protein=6, carbs=1, fats=5, quantity=1, date=DAY)
+                       for _ in range(meals))
+    db.session.add(MealTemplate(user_id=user_id, name='egg', calories=80))
+    db.session.commit()
+    create_notification(user_id, 'hello')
+    rebuild_daily_rollups(user_id)
+
+
+def wait_for_job(client, job_id):
+    for _ in range(500):
+        job = client.get(f'/api/purge/{job_id}').json
+        if job['state'] in ('done', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError('purge did not finish')
+
+
+def test_clear_data_removes_the_users_rows_only(app, client, user):
+    other = User(username='bob', password='x', security_question='pet', security_answer='x')
+    db.session.add(other)
+    db.session.commit()
+    add_history(user.id)
+    add_history(other.id)
+    app.config['PURGE_CHUNK_SIZE'] = 2
+    client.post('/settings', data={'action': 'clear_data'})
+    with client.session_transaction() as s:
+        job_id = s['purge_job_id']
+    job = wait_for_job(client, job_id)
+    assert job['state'] == 'done'
+    assert job['deleted']['meal'] == 5
+    for model in (Meal, MealTemplate, Notification, DailyRollup):
+        assert model.query.filter_by(user_id=user.id).count() == 0
+        assert model.query.filter_by(user_id=other.id).count() > 0
+    assert db.session.get(User, user.id) is not None
+
+
+def test_rollups_are_rebuilt_from_what_the_purge_keeps(app, user):
+    add_history(user.id)
+    max_ids = {model: 0 for model in PURGE_MODELS}
+    #a meal logged while the purge runs has an id above the snapshot and is kept
+    max_ids[Meal] = db.session.query(db.func.max(Meal.id)).scalar()
+    db.session.add(Meal(user_id=user.id, name='late', calories=555, protein=1, carbs=1, fats=1, quantity=1, date=DAY))
+    db.session.commit()
+    purge_user(user.id, max_ids=max_ids)
+    assert [r.calories_consumed for r in DailyRollup.query.filter_by(user_id=user.id)] == [555]
+
+
+def test_delete_account_blocks_login_and_other_sessions(app, client, user):
+    user_id = user.id
+    add_history(user_id)
+    other_session = app.test_client()
+    with other_session.session_transaction() as s:
+        s['user_id'] = user_id
+    with app.app_context():
+        #hold the purge worker so the deletion is still in progress
+        purge_jobs._executor.submit(time.sleep, 0.5)
+    client.post('/settings', data={'action': 'delete_account'})
+    assert db.session.get(User, user_id).deleted_at is not None
+    login = app.test_client().post('/login', data={'username': 'alice', 'password': PASSWORD})
+    assert 'being deleted' in login.get_data(as_text=True)
+    response = other_session.post('/api/meals/batch', json=[{'name': 'egg', 'calories': 80}])
+    assert response.status_code == 401
+    with other_session.session_transaction() as s:
+        assert 'user_id' not in s
+    purge_jobs.shutdown()
+    db.session.expire_all()
+    assert db.session.get(User, user_id) is None
+    assert Meal.query.count() == 0
+
+
+def test_interrupted_deletion_is_finished_by_the_cli(app, user):
+    add_history(user.id)
+    user.deleted_at = datetime.utcnow()
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=['purge-deleted-accounts'])
+    assert '1 account(s) deleted' in result.output
+    db.session.expire_all()
+    assert User.query.count() == 0
+    assert Meal.query.count() == 0
+    assert DailyRollup.query.count() == 0
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from app import NotificationScheduler
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_jobs_with_the_same_key_coalesce_until_they_finish(app):
+    scheduler = NotificationScheduler(app)
+    release = threading.Event()
+    runs = []
+
+    def job(n):
+        runs.append(n)
+        release.wait(5)
+
+    try:
+        assert scheduler.schedule(('login_checks', 1), 0, job, 1)
+        assert wait_for(lambda: runs == [1])
+        #the first job is still running, so repeated logins are dropped
+        assert not scheduler.schedule(('login_checks', 1), 0, job, 2)
+        assert scheduler.schedule(('login_checks', 2), 0, job, 3)
+        release.set()
+        assert wait_for(lambda: scheduler.pending_count() == 0)
+    finally:
+        scheduler.shutdown()
+    assert sorted(runs) == [1, 3]
+
+
+def test_a_finished_job_can_be_scheduled_again(app):
+    scheduler = NotificationScheduler(app)
+    runs = []
+    try:
+        scheduler.schedule('key', 0, runs.append, 1)
+        assert wait_for(lambda: scheduler.pending_count() == 0)
+        assert scheduler.schedule('key', 0, runs.append, 2)
+        assert wait_for(lambda: scheduler.pending_count() == 0)
+    finally:
+        scheduler.shutdown()
+    assert runs == [1, 2]
@@ -0,0 +1,10 @@
+import gc
+
+from app import create_app
+
+#FITTRACK_CONFIG=production gunicorn wsgi:app picks up gunicorn.conf.py: the app is built once in the master and the
+#threaded workers fork from it
+#with several workers set FITTRACK_METRICS_CACHE_URL too, the default metrics cache is per process
+app = create_app()
+#keep the preloaded objects out of the collector so gc passes in the workers don't dirty the shared pages
+gc.freeze()